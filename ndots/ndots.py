@@ -1,8 +1,29 @@
+import bisect
 import collections
+import hashlib
+import itertools
+import json
+import operator
+import re
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 __version__ = "1.0.0"
 
-__all__ = "fifteendots fiftydots twentyfourdots".split()
+__all__ = "fifteendots fiftydots twentyfourdots available_fonts Canvas CounterRenderer Max7219Chain Hub75Frame AnsiDisplay Bitmap RenderOptions Renderer strip_map export_atlas PackedFont pack_font load_font memory_report".split()
+
+_REVERSED_BITS = bytes(int(format(i, "08b")[::-1], 2) for i in range(256))
+_UNPACKED_BITS = tuple(bytes(int(bit) for bit in format(i, "08b")) for i in range(256))
+_HALF_BLOCKS = {0: " ", 1: "\u2580", 2: "\u2584", 3: "\u2588"}
+_BRAILLE = {i: chr(0x2800 + i) for i in range(256)}
+_BRAILLE_BITS = ((0x01, 0x08), (0x02, 0x10), (0x04, 0x20), (0x40, 0x80))  # (left, right) dot per row of a braille character
 
 
 def available_fonts():
@@ -16,18 +37,62 @@ def available_fonts():
     return (fifteendots, fiftydots, twentyfourdots)
 
 
+_interned = {}  # rows and glyphs (tuples), shared between all fonts
+
+
+def _intern(value):
+    return _interned.setdefault(value, value)
+
+
+def memory_report():
+    """
+    memory footprint of the glyph definitions of the available fonts
+
+    Returns
+    -------
+    bytes used per font name, and for all fonts together : dict
+        each value is a dict with
+            "before": bytes if each row was a separate list of bools
+            "after": bytes of the distinct interned rows and glyphs
+        for a single font, rows and glyphs shared with other fonts are counted in full
+    """
+
+    def footprint(fonts):
+        before = 0
+        distinct = {}
+        for font in fonts:
+            for glyph in font._chartable.values():
+                before += sys.getsizeof(list(glyph)) + sum(sys.getsizeof(list(row)) for row in glyph)
+                distinct[id(glyph)] = glyph
+                distinct.update((id(row), row) for row in glyph)
+        return {"before": before, "after": sum(sys.getsizeof(value) for value in distinct.values())}
+
+    result = {font.name(): footprint([font]) for font in available_fonts()}
+    result["all"] = footprint(available_fonts())
+    return result
+
+
 class _Dots:
+    # per glyph caches, keyed by (char, ...)
+    _char_caches = ("_packed_chars", "_packed_char_columns", "_packed_char_pages", "_str_chars", "_rectangles_chars", "_contours_chars", "_nearest_order_chars")
+
     def __init__(self, height, width, name, spec):
-        self._chartable = collections.defaultdict(list)
+        chartable = collections.defaultdict(list)
         for line in spec.splitlines():
             if line:
                 if len(line) == 1:
                     char = line
                 else:
-                    self._chartable[char].append([vl == "*" for vl in line])
+                    chartable[char].append(_intern(tuple(vl == "*" for vl in line)))
+        # rows and glyphs are immutable tuples, shared between all glyphs and fonts
+        self._chartable = {char: _intern(tuple(lines)) for char, lines in chartable.items()}
         self._height = height
         self._width = width
         self._name = name
+        for cache in self._char_caches:
+            setattr(self, cache, {})
+        self._window_starts = (None, None)
+        self._renderers = {}
 
     def width(self):
         """
@@ -89,12 +154,94 @@ class _Dots:
 
         return [line[filled_cols[0] : filled_cols[-1] + 1] for line in chartable]
 
+    def _packed_char(self, c, default=" ", proportional=False, narrow=False):
+        # returns (width, rows, bits) of a glyph, where rows are ints with the leftmost dot as most significant bit
+        # and bits are the same rows as strings of 0s and 1s. The result is cached.
+        if not self.has_char(c):
+            c = default
+        key = (c, bool(proportional), bool(narrow) and bool(proportional))
+        try:
+            return self._packed_chars[key]
+        except KeyError:
+            pass
+        lines = self._grid_char(c, default=default, proportional=proportional, narrow=narrow)
+        bits = tuple("".join("1" if vl else "0" for vl in line) for line in lines)
+        packed_char = (len(bits[0]), tuple(int(line, 2) for line in bits), bits)
+        self._packed_chars[key] = packed_char
+        return packed_char
+
+    def _packed_columns_char(self, c, default=" ", proportional=False, narrow=False):
+        # returns the columns of a glyph as ints, with the top dot as least significant bit. The result is cached.
+        if not self.has_char(c):
+            c = default
+        key = (c, bool(proportional), bool(narrow) and bool(proportional))
+        try:
+            return self._packed_char_columns[key]
+        except KeyError:
+            pass
+        width, rows, _ = self._packed_char(c, proportional=proportional, narrow=narrow)
+        columns = tuple(sum(((row >> (width - 1 - x)) & 1) << y for y, row in enumerate(rows)) for x in range(width))
+        self._packed_char_columns[key] = columns
+        return columns
+
+    def _packed_pages_char(self, c, default=" ", proportional=False, narrow=False):
+        # returns the 8 dot high pages of a glyph as bytes (one byte per column, top dot as least significant bit).
+        # The result is cached.
+        if not self.has_char(c):
+            c = default
+        key = (c, bool(proportional), bool(narrow) and bool(proportional))
+        try:
+            return self._packed_char_pages[key]
+        except KeyError:
+            pass
+        columns = self._packed_columns_char(c, proportional=proportional, narrow=narrow)
+        pages = tuple(bytes((column >> shift) & 0xFF for column in columns) for shift in range(0, self._height, 8))
+        self._packed_char_pages[key] = pages
+        return pages
+
+    def _packed_lines(self, s, default=" ", intra=1, proportional=False, narrow=False):
+        glyphs = [self._packed_char(c, default=default, proportional=proportional, narrow=narrow) for c in s]
+        if not glyphs:
+            return 0, [0] * self._height
+        intra = max(intra, 0)
+        width = sum(glyph[0] for glyph in glyphs) + (len(glyphs) - 1) * intra
+        gap = intra * "0"
+        return width, [int(gap.join([glyph[2][y] for glyph in glyphs]), 2) for y in range(self._height)]
+
+    @staticmethod
+    def _align_offset(actual_width, width, align):
+        # returns the x-position of the first dot of a text of actual_width in a result of the given width,
+        # exactly as grid pads (offset >= 0) or chops (offset < 0)
+        extra = width - actual_width
+        if align.lower().startswith("c"):
+            return extra // 2 if extra >= 0 else -(-extra // 2)
+        if align.lower().startswith("l"):
+            return 0
+        if align.lower().startswith("r"):
+            return extra
+        raise ValueError("align does not start with c, l or r")
+
+    def _packed(self, s, default=" ", intra=1, proportional=False, width=None, align="c", narrow=False):
+        # packed equivalent of grid: returns (width, rows), where each row is an int with the leftmost dot as most significant bit
+        if len(default) != 1:
+            raise ValueError("len of default is not 1")
+        actual_width, rows = self._packed_lines(s, default=default, intra=intra, proportional=proportional, narrow=narrow)
+        if width is None:
+            return actual_width, rows
+        shift = width - actual_width - self._align_offset(actual_width, width, align)
+        mask = (1 << width) - 1
+        if shift >= 0:
+            return width, [(row << shift) & mask for row in rows]
+        return width, [(row >> -shift) & mask for row in rows]
+
     def _str_to_pixel_lines(self, s, default=" ", intra=1, proportional=False, narrow=False):
         result = []
         for y in range(self._height):
             line = []
             for i, c in enumerate(s):
-                line.extend((i != 0) * intra * [False] + self._grid_char(c, default=default, proportional=proportional, narrow=narrow)[y])
+                if i != 0:
+                    line.extend(intra * [False])
+                line.extend(self._grid_char(c, default=default, proportional=proportional, narrow=narrow)[y])
             result.append(line)
         return result
 
@@ -183,34 +330,12 @@ class _Dots:
         if width is None:
             return pixel_lines
         actual_width = len(pixel_lines[0])
-        extra = width - actual_width
-
-        if extra >= 0:
-            if align.lower().startswith("c"):
-                extra_left = extra // 2
-                extra_right = extra - extra_left
-            elif align.lower().startswith("l"):
-                extra_left = 0
-                extra_right = extra
-            elif align.lower().startswith("r"):
-                extra_left = extra
-                extra_right = 0
-            else:
-                raise ValueError("align does not start with c, l or r")
-
-            return [extra_left * [False] + line + extra_right * [False] for line in pixel_lines]
-        else:
-            if align.lower().startswith("c"):
-                start = -extra // 2
-            elif align.lower().startswith("l"):
-                start = 0
-            elif align.lower().startswith("r"):
-                start = -extra
-            else:
-                raise ValueError("align does not start with c, l or r")
-            return [line[start : start + width] for line in pixel_lines]
+        offset = self._align_offset(actual_width, width, align)
+        if width >= actual_width:
+            return [offset * [False] + line + (width - actual_width - offset) * [False] for line in pixel_lines]
+        return [line[-offset : width - offset] for line in pixel_lines]
 
-    def coordinates(self, s, value=True, default=" ", intra=1, proportional=False, width=None, align="c", x_first=False, narrow=False, x_offset=0, y_offset=0):
+    def coordinates(self, s, value=True, default=" ", intra=1, proportional=False, width=None, align="c", x_first=False, narrow=False, x_offset=0, y_offset=0, order=None):
         """
         returns a list of coordinates representing the text s in the font
 
@@ -262,36 +387,2563 @@ class _Dots:
         y_offset : int
             adds this value to each of the y-coordinates (default 0)
 
+        order : str
+            if None (default), the order is determined by x_first
+            if "serpentine", coordinates will be given column by column, alternating downwards and upwards
+            if "nearest", coordinates will be given in nearest neighbour order per character, with the characters
+            stitched such that the travel between them is short (useful for plotters and laser markers)
+
         Returns
         -------
         a list of coordinates (tuples) : list
         """
+        if order == "nearest":
+            return self._nearest_coordinates(s, value=value, default=default, intra=intra, proportional=proportional, width=width, align=align, narrow=narrow, x_offset=x_offset, y_offset=y_offset)
         result = []
         ct = self.grid(s, default=default, intra=intra, proportional=proportional, width=width, align=align, narrow=narrow)
+        if order == "serpentine":
+            columns = ([(x, y) for y in range(self._height) if ct[y][x] == value] for x in range(len(ct[0])))
+            columns = [column for column in columns if column]
+            return [(x + x_offset, y + y_offset) for i, column in enumerate(columns) for x, y in (column[::-1] if i % 2 else column)]
+        if order is not None:
+            raise ValueError("order is not None, serpentine or nearest")
         result = [(x + x_offset, y + y_offset) for y in range(self._height) for x, c in enumerate(ct[y]) if c == value]
         if x_first:
             result.sort()
         return result
 
-    def grid_to_str(self, s, leftborder="<", rightborder=">", **kwargs):
+    def _nearest_order_char(self, c, default=" ", proportional=False, narrow=False):
+        # returns the set dots of a glyph in nearest neighbour order. The result is cached.
+        if not self.has_char(c):
+            c = default
+        key = (c, bool(proportional), bool(narrow) and bool(proportional))
+        try:
+            return self._nearest_order_chars[key]
+        except KeyError:
+            pass
+        width, rows, _ = self._packed_char(c, proportional=proportional, narrow=narrow)
+        nearest_order = tuple(_nearest_neighbour_order([(x, y) for y, row in enumerate(rows) for x, _ in _runs(row, width, single=True)]))
+        self._nearest_order_chars[key] = nearest_order
+        return nearest_order
+
+    def _nearest_coordinates(self, s, value=True, default=" ", intra=1, proportional=False, width=None, align="c", narrow=False, x_offset=0, y_offset=0):
+        if len(default) != 1:
+            raise ValueError("len of default is not 1")
+        if not value:
+            # the non set dots are ordered per band of character width
+            packed_width, rows = self._packed(s, default=default, intra=intra, proportional=proportional, width=width, align=align, narrow=narrow)
+            mask = (1 << packed_width) - 1
+            dots = [(x, y) for y, row in enumerate(rows) for x, _ in _runs(row ^ mask, packed_width, single=True)]
+            bands = collections.defaultdict(list)
+            for x, y in dots:
+                bands[x // (self._width + 1)].append((x, y))
+            groups = [_nearest_neighbour_order(bands[band]) for band in sorted(bands)]
+        else:
+            intra = max(intra, 0)
+            widths = [self._packed_char(c, default=default, proportional=proportional, narrow=narrow)[0] for c in s]
+            actual_width = sum(widths) + max(len(s) - 1, 0) * intra
+            x_char = 0 if width is None else self._align_offset(actual_width, width, align)
+            x_max = actual_width if width is None else width
+            groups = []
+            for c, char_width in zip(s, widths):
+                group = [(x + x_char, y) for x, y in self._nearest_order_char(c, default=default, proportional=proportional, narrow=narrow)]
+                groups.append([(x, y) for x, y in group if 0 <= x < x_max])
+                x_char += char_width + intra
+        return [(x + x_offset, y + y_offset) for x, y in _stitch(groups)]
+
+    def _char_starts(self, s, default=" ", intra=1, proportional=False, narrow=False):
+        # returns the x-positions of all characters of s (prefix sums of the advances)
+        # the result for the latest string and options is cached, as the same text is usually shown through many windows
+        key = (s, default, intra, bool(proportional), bool(narrow))
+        if self._window_starts[0] == key:
+            return self._window_starts[1]
+        intra = max(intra, 0)
+        starts = [0]
+        starts.extend(itertools.accumulate(self._packed_char(c, default=default, proportional=proportional, narrow=narrow)[0] + intra for c in s))
+        self._window_starts = (key, starts)
+        return starts
+
+    def _packed_window(self, s, x_start, x_end, default=" ", intra=1, proportional=False, narrow=False):
+        if len(default) != 1:
+            raise ValueError("len of default is not 1")
+        width = max(x_end - x_start, 0)
+        starts = self._char_starts(s, default=default, intra=intra, proportional=proportional, narrow=narrow)
+        first = max(bisect.bisect_right(starts, x_start, hi=len(s)) - 1, 0)
+        last = bisect.bisect_left(starts, x_end, hi=len(s))
+        actual_width, rows = self._packed_lines(s[first:last], default=default, intra=intra, proportional=proportional, narrow=narrow)
+        shift = width - actual_width - (starts[first] - x_start)
+        mask = (1 << width) - 1
+        if shift >= 0:
+            return width, [(row << shift) & mask for row in rows]
+        return width, [(row >> -shift) & mask for row in rows]
+
+    def render_window(self, s, x_start, x_end, default=" ", intra=1, proportional=False, narrow=False):
         """
-        returns a string representing the given string s, using * if a pixel is set.
+        returns a list of boolean lists to represent the dots x_start up to (not including) x_end of the text s
+
+        Only the characters that overlap the window are rendered, which makes this suitable for
+        scrolling (very) long texts. Dots outside the text are not set.
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        x_start : int
+            first dot of the window (may be negative)
+
+        x_end : int
+            dot after the last dot of the window
+
+        default : str
+            if a character has no representation in the font, it will be replaced
+            with default, that is a blank by default
+            if the length is not 1, a ValueError will be raised
+
+        intra : int
+            number of dots between characters
+            default is 1
+
+        proportional : bool
+            if proportional is False (default), all characters will be 5 dots wide
+            if proportional is True, the actual width of the character will be used
+            Note that in case of proportional, a blank will be 2 dots wide.
+
+        narrow : bool
+            if False (default), blanks will be 2 wide when proportional is True
+            if True, blanks will be 1 wide when proportional is True
+
+        Returns
+        -------
+        the representation of the window : list of boolean lists
+        each set dot will be True, not set False
+
+        Note
+        ----
+        The result is the same as [line[x_start:x_end] for line in grid(s, ...)] for 0 <= x_start <= x_end.
+        """
+        width, rows = self._packed_window(s, x_start, x_end, default=default, intra=intra, proportional=proportional, narrow=narrow)
+        return _rows_to_grid(rows, width)
+
+    def iter_columns(self, chars, default=" ", intra=1, proportional=False, narrow=False):
+        """
+        generates the columns of a text, that is consumed lazily
+
+        This is suitable for driving (scrolling) displays from unbounded sources, like a generator, file or socket,
+        as the memory use is constant.
+
+        Parameters
+        ----------
+        chars : iterable of str
+            the characters to represent
+            the items may also be strings of any length (e.g. the lines of a file)
+
+        default : str
+            if a character has no representation in the font, it will be replaced
+            with default, that is a blank by default
+            if the length is not 1, a ValueError will be raised
+
+        intra : int
+            number of dots between characters
+            default is 1
+
+        proportional : bool
+            if proportional is False (default), all characters will be 5 dots wide
+            if proportional is True, the actual width of the character will be used
+            Note that in case of proportional, a blank will be 2 dots wide.
+
+        narrow : bool
+            if False (default), blanks will be 2 wide when proportional is True
+            if True, blanks will be 1 wide when proportional is True
+
+        Returns
+        -------
+        generator of columns : generator of ints
+        each column has the top dot as least significant bit
+        """
+        if len(default) != 1:
+            raise ValueError("len of default is not 1")
+        gap = max(intra, 0) * (0,)
+
+        def columns():
+            first = True
+            for chunk in chars:
+                for c in chunk:
+                    if first:
+                        first = False
+                    else:
+                        yield from gap
+                    yield from self._packed_columns_char(c, default=default, proportional=proportional, narrow=narrow)
+
+        return columns()
+
+    def scan_rows(self, s, msb_first=True, invert=False, as_bytes=False, **kwargs):
+        """
+        generates the rows of the text s in wire format, e.g. for driving multiplexed led matrices
+
+        The rows are built from the cached packed glyphs, so without building a grid.
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        msb_first : bool
+            if True (default), the leftmost dot will be the most significant bit
+            if False, the leftmost dot will be the least significant bit
+
+        invert : bool
+            if False (default), a set dot will be a 1 bit
+            if True, a set dot will be a 0 bit (for active low drivers)
+
+        as_bytes : bool
+            if False (default), each row will be an int
+            if True, each row will be a bytes object, padded with 0 bits to a multiple of 8 dots.
+            The leftmost dot is in the first byte, at the most significant bit if msb_first is True,
+            at the least significant bit otherwise.
+
+        all parameters for grid may be given as well
+
+        Returns
+        -------
+        generator of rows (from top to bottom) : generator of ints or bytes
+        """
+        width, rows = self._packed(s, **kwargs)
+        if invert:
+            mask = (1 << width) - 1
+            rows = [row ^ mask for row in rows]
+        if as_bytes:
+            number_of_bytes = (width + 7) // 8
+            pad = 8 * number_of_bytes - width
+            rows_bytes = ((row << pad).to_bytes(number_of_bytes, "big") for row in rows)
+            return rows_bytes if msb_first else (row_bytes.translate(_REVERSED_BITS) for row_bytes in rows_bytes)
+        if msb_first:
+            return iter(rows)
+        return (int(format(row | (1 << width), "b")[:0:-1] or "0", 2) for row in rows)
+
+    def to_pages(self, s, default=" ", intra=1, proportional=False, width=None, align="c", narrow=False):
+        """
+        returns the text s in the page format of SSD1306 style (oled) displays
+
+        Each page is 8 dots high and consists of one byte per column, with the top dot as least significant bit.
+        The pages are built from cached glyph pages, so without building a grid.
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        default : str
+            if a character has no representation in the font, it will be replaced
+            with default, that is a blank by default
+            if the length is not 1, a ValueError will be raised
+
+        intra : int
+            number of dots between characters
+            default is 1
+
+        proportional : bool
+            if proportional is False (default), all characters will be 5 dots wide
+            if proportional is True, the actual width of the character will be used
+            Note that in case of proportional, a blank will be 2 dots wide.
+
+        width : int
+            width in dots of the result
+            the default is the actal width (no align applied)
+            if the actual width is smaller than width, the string will be padded according to the align parameter
+            if the actual width is larger than width, the string is chopped according to the align parameter
+
+        align : str
+            if align starts with a c (default), the result will be centered
+            if align starts with a l, the result will be left aligned
+            if align starts with a r, the result will be right aligned
+
+        narrow : bool
+            if False (default), blanks will be 2 wide when proportional is True
+            if True, blanks will be 1 wide when proportional is True
+
+        Returns
+        -------
+        the pages (top page first), each with one byte per column : bytes
+        """
+        if len(default) != 1:
+            raise ValueError("len of default is not 1")
+        glyphs = [self._packed_pages_char(c, default=default, proportional=proportional, narrow=narrow) for c in s]
+        gap = bytes(max(intra, 0))
+        pages = [gap.join([glyph[page] for glyph in glyphs]) for page in range((self._height + 7) // 8)]
+        if width is not None:
+            actual_width = len(pages[0])
+            offset = self._align_offset(actual_width, width, align)
+            if width >= actual_width:
+                pages = [bytes(offset) + page + bytes(width - actual_width - offset) for page in pages]
+            else:
+                pages = [page[-offset : width - offset] for page in pages]
+        return b"".join(pages)
+
+    def to_ws2812(self, s, color=(255, 255, 255), background=(0, 0, 0), origin="top-left", orientation="rows", serpentine=True, **kwargs):
+        """
+        returns the text s as a buffer for an addressable (WS2812 style) led matrix
+
+        The matrix has the width of the result and the height of the font.
+        The dots are permuted into strip order with one cached permutation (see strip_map).
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        color : tuple of 3 ints
+            red, green and blue value (0-255) of the set dots
+            default: (255, 255, 255)
+
+        background : tuple of 3 ints
+            red, green and blue value (0-255) of the non set dots
+            default: (0, 0, 0)
+
+        origin : str
+            corner of the first led of the strip: "top-left" (default), "top-right", "bottom-left" or "bottom-right"
+
+        orientation : str
+            if "rows" (default), the strip runs along the rows
+            if "columns", the strip runs along the columns
+
+        serpentine : bool
+            if True (default), the direction of the strip alternates per row (column)
+            if False, all rows (columns) run in the same direction
 
-        each line is prefixed with leftborder and postfixed with rightborder.
         all parameters for grid may be given as well
+
+        Returns
+        -------
+        the green, red and blue value of each led, in strip order : bytes
         """
-        l = []
-        for line in self.grid(s, **kwargs):
-            l.append(leftborder + ("".join("*" if vl else " " for vl in line)) + rightborder)
-        return "\n".join(l)
+        width, rows = self._packed(s, **kwargs)
+        order = _strip_order(width, self._height, origin, orientation, serpentine)
+        dots = b"".join(_unpack_row(row, width) for row in rows)
+        palette = (bytes((background[1], background[0], background[2])), bytes((color[1], color[0], color[2])))
+        return b"".join(map(palette.__getitem__, order(dots)))
 
-    def _check(self):
-        for s in self._chartable:
-            for i, c in enumerate(self._chartable[s]):
-                if len(c) != self._width:
-                    print(f"maybe error in {s} line {i}")
-            if i != self._height - 1:
-                print(f"error in {s} number of lines is {i+1}")
+    def _rectangles_char(self, c, default=" ", proportional=False, narrow=False):
+        # returns the set dots of a glyph as (x, y, width, height) rectangles. The result is cached.
+        if not self.has_char(c):
+            c = default
+        key = (c, bool(proportional), bool(narrow) and bool(proportional))
+        try:
+            return self._rectangles_chars[key]
+        except KeyError:
+            pass
+        width, rows, _ = self._packed_char(c, proportional=proportional, narrow=narrow)
+        rectangles = tuple(_rectangles(rows, width))
+        self._rectangles_chars[key] = rectangles
+        return rectangles
+
+    def rectangles(self, s, default=" ", intra=1, proportional=False, width=None, align="c", narrow=False, x_offset=0, y_offset=0):
+        """
+        returns a small set of rectangles that exactly cover the set dots of the text s
+
+        The rectangles of each glyph are cached and rectangles that touch at glyph boundaries
+        (with the same y and height) are merged. This is useful for backends that draw one primitive per call.
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        default : str
+            if a character has no representation in the font, it will be replaced
+            with default, that is a blank by default
+            if the length is not 1, a ValueError will be raised
+
+        intra : int
+            number of dots between characters
+            default is 1
+
+        proportional : bool
+            if proportional is False (default), all characters will be 5 dots wide
+            if proportional is True, the actual width of the character will be used
+            Note that in case of proportional, a blank will be 2 dots wide.
+
+        width : int
+            width in dots of the result
+            the default is the actal width (no align applied)
+            if the actual width is smaller than width, the string will be padded according to the align parameter
+            if the actual width is larger than width, the string is chopped according to the align parameter
+
+        align : str
+            if align starts with a c (default), the result will be centered
+            if align starts with a l, the result will be left aligned
+            if align starts with a r, the result will be right aligned
+
+        narrow : bool
+            if False (default), blanks will be 2 wide when proportional is True
+            if True, blanks will be 1 wide when proportional is True
+
+        x_offset : int
+            adds this value to each of the x-coordinates (default 0)
+
+        y_offset : int
+            adds this value to each of the y-coordinates (default 0)
+
+        Returns
+        -------
+        a list of rectangles (x, y, width, height), ordered by y and x : list of tuples
+        """
+        if len(default) != 1:
+            raise ValueError("len of default is not 1")
+        intra = max(intra, 0)
+        widths = [self._packed_char(c, default=default, proportional=proportional, narrow=narrow)[0] for c in s]
+        if width is None:
+            x = 0
+            x_max = sum(widths) + max(len(s) - 1, 0) * intra
+        else:
+            x = self._align_offset(sum(widths) + max(len(s) - 1, 0) * intra, width, align)
+            x_max = width
+        result = []
+        ending_at = {}  # (x, y, height) : index in result of the rectangle that ends at x
+        for c, char_width in zip(s, widths):
+            for rectangle_x, rectangle_y, rectangle_width, rectangle_height in self._rectangles_char(c, default=default, proportional=proportional, narrow=narrow):
+                x_start = max(x + rectangle_x, 0)
+                x_end = min(x + rectangle_x + rectangle_width, x_max)
+                if x_start < x_end:
+                    index = ending_at.pop((x_start, rectangle_y, rectangle_height), None)
+                    if index is None:
+                        index = len(result)
+                        result.append((x_start, rectangle_y, x_end - x_start, rectangle_height))
+                    else:
+                        result[index] = (result[index][0], rectangle_y, x_end - result[index][0], rectangle_height)
+                    ending_at[x_end, rectangle_y, rectangle_height] = index
+            x += char_width + intra
+        result.sort(key=lambda rectangle: (rectangle[1], rectangle[0]))
+        return [(x + x_offset, y + y_offset, rectangle_width, rectangle_height) for x, y, rectangle_width, rectangle_height in result]
+
+    def _contours_char(self, c, default=" ", proportional=False, narrow=False):
+        # returns the contours of a glyph. The result is cached.
+        if not self.has_char(c):
+            c = default
+        key = (c, bool(proportional), bool(narrow) and bool(proportional))
+        try:
+            return self._contours_chars[key]
+        except KeyError:
+            pass
+        width, rows, _ = self._packed_char(c, proportional=proportional, narrow=narrow)
+        contours = tuple(tuple(contour) for contour in _contours(rows, width))
+        self._contours_chars[key] = contours
+        return contours
+
+    def contours(self, s, default=" ", intra=1, proportional=False, width=None, align="c", narrow=False, x_offset=0, y_offset=0):
+        """
+        returns the outlines of the set dots of the text s as closed polygons
+
+        The vertices are at the corners of the dots, so a single dot at (x, y) has the outline
+        (x, y), (x + 1, y), (x + 1, y + 1), (x, y + 1).
+        Outer outlines are clockwise and the outlines of holes counterclockwise (with y pointing down).
+        Dots that only touch diagonally belong to separate outlines.
+        The outlines of each glyph are cached and reused as long as the glyphs can't touch (intra >= 1 and the text is not chopped).
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        default : str
+            if a character has no representation in the font, it will be replaced
+            with default, that is a blank by default
+            if the length is not 1, a ValueError will be raised
+
+        intra : int
+            number of dots between characters
+            default is 1
+
+        proportional : bool
+            if proportional is False (default), all characters will be 5 dots wide
+            if proportional is True, the actual width of the character will be used
+            Note that in case of proportional, a blank will be 2 dots wide.
+
+        width : int
+            width in dots of the result
+            the default is the actal width (no align applied)
+            if the actual width is smaller than width, the string will be padded according to the align parameter
+            if the actual width is larger than width, the string is chopped according to the align parameter
+
+        align : str
+            if align starts with a c (default), the result will be centered
+            if align starts with a l, the result will be left aligned
+            if align starts with a r, the result will be right aligned
+
+        narrow : bool
+            if False (default), blanks will be 2 wide when proportional is True
+            if True, blanks will be 1 wide when proportional is True
+
+        x_offset : int
+            adds this value to each of the x-coordinates (default 0)
+
+        y_offset : int
+            adds this value to each of the y-coordinates (default 0)
+
+        Returns
+        -------
+        a list of polygons, each a list of vertices (x, y) : list of lists of tuples
+        """
+        if len(default) != 1:
+            raise ValueError("len of default is not 1")
+        widths = [self._packed_char(c, default=default, proportional=proportional, narrow=narrow)[0] for c in s]
+        actual_width = sum(widths) + max(len(s) - 1, 0) * max(intra, 0)
+        if intra < 1 or (width is not None and width < actual_width):
+            packed_width, rows = self._packed(s, default=default, intra=intra, proportional=proportional, width=width, align=align, narrow=narrow)
+            return [[(x + x_offset, y + y_offset) for x, y in contour] for contour in _contours(rows, packed_width)]
+        x = x_offset if width is None else x_offset + self._align_offset(actual_width, width, align)
+        result = []
+        for c, char_width in zip(s, widths):
+            for contour in self._contours_char(c, default=default, proportional=proportional, narrow=narrow):
+                result.append([(vertex_x + x, vertex_y + y_offset) for vertex_x, vertex_y in contour])
+            x += char_width + intra
+        return result
+
+    def _str_char(self, c, on="*", off=" ", default=" ", proportional=False, narrow=False):
+        # returns the rows of a glyph as strings of on and off characters. The result is cached.
+        if not self.has_char(c):
+            c = default
+        key = (c, bool(proportional), bool(narrow) and bool(proportional), on, off)
+        try:
+            return self._str_chars[key]
+        except KeyError:
+            pass
+        translation = {ord("0"): off, ord("1"): on}
+        lines = tuple(line.translate(translation) for line in self._packed_char(c, proportional=proportional, narrow=narrow)[2])
+        self._str_chars[key] = lines
+        return lines
+
+    def _str_lines(self, s, on="*", off=" ", default=" ", intra=1, proportional=False, width=None, align="c", narrow=False):
+        if len(default) != 1:
+            raise ValueError("len of default is not 1")
+        if len(on) != 1 or len(off) != 1:
+            raise ValueError("len of on or off is not 1")
+        glyphs = [self._str_char(c, on=on, off=off, default=default, proportional=proportional, narrow=narrow) for c in s]
+        gap = max(intra, 0) * off
+        lines = [gap.join([glyph[y] for glyph in glyphs]) for y in range(self._height)]
+        if width is None:
+            return lines
+        actual_width = len(lines[0])
+        offset = self._align_offset(actual_width, width, align)
+        if width >= actual_width:
+            return [offset * off + line + (width - actual_width - offset) * off for line in lines]
+        return [line[-offset : width - offset] for line in lines]
+
+    def renderer(self, options=None, **kwargs):
+        """
+        returns a renderer for this font, with the options validated once and the glyphs prepared for them
+
+        Parameters
+        ----------
+        options : RenderOptions
+            options to render with
+            if None (default), the options are created from the other parameters
+
+        all parameters for grid (except s) may be given as well
+
+        Returns
+        -------
+        a renderer, that can be called with a text, with the same result as grid : Renderer
+        The renderer is cached per options.
+        """
+        if options is None:
+            options = RenderOptions(**kwargs)
+        elif kwargs:
+            options = options.replace(**kwargs)
+        try:
+            return self._renderers[options]
+        except KeyError:
+            pass
+        renderer = Renderer(self, options)
+        self._renderers[options] = renderer
+        return renderer
+
+    def bitmap(self, s, **kwargs):
+        """
+        returns the text s as an immutable bitmap
+
+        all parameters for grid may be given as well
+
+        Returns
+        -------
+        the representation of s : Bitmap
+        """
+        width, rows = self._packed(s, **kwargs)
+        return Bitmap.from_rows(rows, width)
+
+    def grid_to_str(self, s, leftborder="<", rightborder=">", on="*", off=" ", **kwargs):
+        """
+        returns a string representing the given string s, using on ("*") if a pixel is set and off (" ") if not.
+
+        each line is prefixed with leftborder and postfixed with rightborder.
+        all parameters for grid may be given as well
+        """
+        return "\n".join([leftborder + line + rightborder for line in self._str_lines(s, on=on, off=off, **kwargs)])
+
+    def grid_to_ansi(self, s, color=None, background=None, **kwargs):
+        """
+        returns a string representing the given string s for a terminal, with two rows of dots per line
+
+        Each character represents two vertically adjacent dots, with the half block characters
+        \u2580 (upper dot set), \u2584 (lower dot set) and \u2588 (both set).
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        color : tuple of 3 ints
+            red, green and blue value (0-255) of the set dots
+            if None (default), the terminal's foreground color is used
+
+        background : tuple of 3 ints
+            red, green and blue value (0-255) of the non set dots
+            if None (default), the terminal's background color is used
+
+        all parameters for grid may be given as well
+
+        Returns
+        -------
+        lines, separated by newlines : str
+        """
+        width, rows = self._packed(s, **kwargs)
+        prefix = _ansi_colors(color, background)
+        suffix = "\x1b[0m" if prefix else ""
+        return "\n".join(prefix + line + suffix for line in _half_block_lines(rows, width))
+
+    def grid_to_braille(self, s, **kwargs):
+        """
+        returns a string representing the given string s with braille characters
+
+        Each braille character (U+2800-U+28FF) represents a block of 2 * 4 dots.
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        all parameters for grid may be given as well
+
+        Returns
+        -------
+        lines, separated by newlines : str
+        """
+        width, rows = self._packed(s, **kwargs)
+        number_of_characters = (width + 1) // 2
+        rows = rows + [0] * (-len(rows) % 4)
+        lines = []
+        for y in range(0, len(rows), 4):
+            code = 0
+            for row, (left_bit, right_bit) in zip(rows[y : y + 4], _BRAILLE_BITS):
+                dots = _unpack_row(row << (width % 2), width + width % 2)
+                code += int.from_bytes(dots[0::2], "big") * left_bit + int.from_bytes(dots[1::2], "big") * right_bit
+            lines.append(code.to_bytes(number_of_characters, "big").decode("latin-1").translate(_BRAILLE))
+        return "\n".join(lines)
+
+    def write_pbm(self, fileobj, s, scale=1, **kwargs):
+        """
+        writes the text s as a binary PBM (portable bitmap) image, with set dots black
+
+        The image is streamed row by row from the packed rows, so without building a grid.
+
+        Parameters
+        ----------
+        fileobj : file like object
+            binary file (or socket.makefile("wb")) to write to
+
+        s : str
+            string to represent
+
+        scale : int
+            number of pixels per dot (in both directions)
+            default: 1
+
+        all parameters for grid may be given as well
+        """
+        width, rows = self._packed(s, **kwargs)
+        fileobj.write(f"P4\n{width * scale} {self._height * scale}\n".encode("ascii"))
+        for row in rows:
+            row_bytes = _scaled_row_bytes(row, width, scale)
+            for _ in range(scale):
+                fileobj.write(row_bytes)
+
+    def write_pgm(self, fileobj, s, scale=1, on=0, off=255, **kwargs):
+        """
+        writes the text s as a binary PGM (portable graymap) image
+
+        The image is streamed row by row from the packed rows, so without building a grid.
+
+        Parameters
+        ----------
+        fileobj : file like object
+            binary file (or socket.makefile("wb")) to write to
+
+        s : str
+            string to represent
+
+        scale : int
+            number of pixels per dot (in both directions)
+            default: 1
+
+        on : int
+            gray level (0-255) of set dots
+            default: 0 (black)
+
+        off : int
+            gray level (0-255) of non set dots
+            default: 255 (white)
+
+        all parameters for grid may be given as well
+        """
+        width, rows = self._packed(s, **kwargs)
+        fileobj.write(f"P5\n{width * scale} {self._height * scale}\n255\n".encode("ascii"))
+        gray_levels = bytes.maketrans(b"\x00\x01", bytes((off, on)))
+        for row in rows:
+            row_bytes = b"".join(map(_UNPACKED_BITS.__getitem__, _scaled_row_bytes(row, width, scale)))[: width * scale].translate(gray_levels)
+            for _ in range(scale):
+                fileobj.write(row_bytes)
+
+    def to_png(self, s, dot_size=8, gap=2, shape="square", on_color=(255, 255, 255), off_color=(48, 48, 48), background=(0, 0, 0), **kwargs):
+        """
+        returns the text s as a PNG image, with a tile per dot
+
+        Only zlib and struct are used, so no third party package is required.
+        The tiles are precomputed once per size, shape and colors and the scanlines are assembled by repeating them.
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        dot_size : int
+            size of a dot in pixels
+            default: 8
+
+        gap : int
+            number of pixels between dots and at the border
+            default: 2
+
+        shape : str
+            if "square" (default), dots are squares
+            if "round", dots are circles
+
+        on_color : tuple of 3 ints
+            red, green and blue value (0-255) of set dots
+            default: (255, 255, 255)
+
+        off_color : tuple of 3 ints
+            red, green and blue value (0-255) of non set dots
+            default: (48, 48, 48)
+
+        background : tuple of 3 ints
+            red, green and blue value (0-255) of the gaps (and outside round dots)
+            default: (0, 0, 0)
+
+        all parameters for grid may be given as well
+
+        Returns
+        -------
+        the PNG image : bytes
+        """
+        width, rows = self._packed(s, **kwargs)
+        tile_rows = _png_tile_rows(dot_size, gap, shape, tuple(on_color), tuple(off_color), tuple(background))
+        background_pixels = bytes(background)
+        right_border = gap * background_pixels
+        gap_line = (width * (gap + dot_size) + gap) * background_pixels
+
+        def scanlines():
+            for row in rows:
+                dots = _unpack_row(row, width)
+                for tile_row in tile_rows:
+                    yield b"".join(map(tile_row.__getitem__, dots)) + right_border
+            for _ in range(gap):
+                yield gap_line
+
+        return _png(width * (gap + dot_size) + gap, self._height * (gap + dot_size) + gap, scanlines())
+
+    def to_svg(self, s, dot_size=10, shape="rect", on_color="black", off_color=None, background=None, **kwargs):
+        """
+        returns the text s as an SVG image
+
+        With shape "rect", the set dots are merged into as few rectangles as possible (runs of dots
+        in a row, combined with identical runs in the rows below), which results in small files.
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        dot_size : int or float
+            size of a dot in pixels
+            default: 10
+
+        shape : str
+            if "rect" (default), the dots are drawn as merged rectangles
+            if "circle", each dot is drawn as a circle (with a diameter of 0.9 dot)
+
+        on_color : str
+            svg color of set dots
+            default: "black"
+
+        off_color : str
+            svg color of non set dots
+            if None (default), non set dots are not drawn
+
+        background : str
+            svg color of the background
+            if None (default), the background is transparent
+
+        all parameters for grid may be given as well
+
+        Returns
+        -------
+        the svg image : str
+        """
+        if shape not in ("rect", "circle"):
+            raise ValueError("shape is not rect or circle")
+        width, rows = self._packed(s, **kwargs)
+        mask = (1 << width) - 1
+        result = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width * dot_size}" height="{self._height * dot_size}" viewBox="0 0 {width} {self._height}">'
+        ]
+        if background is not None:
+            result.append(f'<rect width="{width}" height="{self._height}" fill="{background}"/>')
+        for color, color_rows in ((off_color, [row ^ mask for row in rows]), (on_color, rows)):
+            if color is None:
+                continue
+            result.append(f'<g fill="{color}">')
+            if shape == "rect":
+                for x, y, rect_width, rect_height in _rectangles(color_rows, width):
+                    result.append(f'<rect x="{x}" y="{y}" width="{rect_width}" height="{rect_height}"/>')
+            else:
+                for y, row in enumerate(color_rows):
+                    for x, _ in _runs(row, width, single=True):
+                        result.append(f'<circle cx="{x + 0.5}" cy="{y + 0.5}" r="0.45"/>')
+            result.append("</g>")
+        result.append("</svg>")
+        return "\n".join(result)
+
+    def _spec(self, chars=None):
+        # returns the definition of the glyphs of the given chars (default all) in the format of the font specs
+        lines = [""]
+        for c in self._chartable if chars is None else chars:
+            lines.append(c)
+            lines.extend("".join("*" if vl else "." for vl in line) for line in self._chartable[c])
+        lines.append("")
+        return "\n".join(lines)
+
+    def subset(self, chars, name=None):
+        """
+        returns a font with only the given characters (and the blank)
+
+        The glyph caches of this font for these characters are taken over.
+
+        Parameters
+        ----------
+        chars : str or iterable of str
+            characters to include
+            characters that are not defined in this font are ignored
+
+        name : str
+            name of the new font
+            if None (default), the name of this font
+
+        Returns
+        -------
+        a font with the given characters : _Dots
+        """
+        chars = set(chars) | {" "}
+        font = _Dots(height=self._height, width=self._width, name=self._name if name is None else name, spec=self._spec(c for c in self._chartable if c in chars))
+        for cache in self._char_caches:
+            getattr(font, cache).update((key, value) for key, value in getattr(self, cache).items() if key[0] in font._chartable)
+        for c in font._chartable:
+            font._packed_char(c)
+            font._packed_char(c, proportional=True)
+        return font
+
+    def save(self, path):
+        """
+        saves the font to a file, that can be loaded with load_font
+
+        Parameters
+        ----------
+        path : str or Path
+            file name
+        """
+        Path(path).write_text(f"ndots {self._name} {self._height} {self._width}\n{self._spec()}", encoding="utf-8")
+
+    def _check(self):
+        for s in self._chartable:
+            for i, c in enumerate(self._chartable[s]):
+                if len(c) != self._width:
+                    print(f"maybe error in {s} line {i}")
+            if i != self._height - 1:
+                print(f"error in {s} number of lines is {i+1}")
+
+
+def load_font(path):
+    """
+    loads a font that was saved with save
+
+    Parameters
+    ----------
+    path : str or Path
+        file name
+
+    Returns
+    -------
+    the font : _Dots
+    """
+    header, spec = Path(path).read_text(encoding="utf-8").split("\n", 1)
+    _, name, height, width = header.rsplit(" ", 3)
+    return _Dots(height=int(height), width=int(width), name=name, spec=spec)
+
+
+def _nearest_neighbour_order(points):
+    # orders the points greedily by nearest neighbour, starting at the leftmost (topmost) point
+    remaining = set(points)
+    if not remaining:
+        return []
+    current = min(remaining)
+    result = [current]
+    remaining.remove(current)
+    while remaining:
+        x, y = current
+        current = min(remaining, key=lambda point: ((point[0] - x) ** 2 + (point[1] - y) ** 2, point))
+        result.append(current)
+        remaining.remove(current)
+    return result
+
+
+def _stitch(groups):
+    # concatenates the ordered groups of points, reversing a group if that results in less travel
+    result = []
+    x, y = 0, 0
+    for group in groups:
+        if group:
+            if (group[-1][0] - x) ** 2 + (group[-1][1] - y) ** 2 < (group[0][0] - x) ** 2 + (group[0][1] - y) ** 2:
+                group = group[::-1]
+            result.extend(group)
+            x, y = result[-1]
+    return result
+
+
+def _rows_to_grid(rows, width):
+    # converts packed rows (leftmost dot as most significant bit) into a list of boolean lists
+    return [[bit == "1" for bit in format(row | (1 << width), "b")[1:]] for row in rows]
+
+
+def _row_to_bytes(row, width):
+    # converts a packed row into bytes, padded with 0 bits to a multiple of 8 dots
+    number_of_bytes = (width + 7) // 8
+    return (row << (8 * number_of_bytes - width)).to_bytes(number_of_bytes, "big")
+
+
+def _unpack_row(row, width):
+    # converts a packed row into bytes with one byte (0 or 1) per dot
+    return b"".join(map(_UNPACKED_BITS.__getitem__, _row_to_bytes(row, width)))[:width]
+
+
+_runs_patterns = {False: re.compile("1+"), True: re.compile("1")}
+
+
+def _runs(row, width, single=False):
+    # returns the runs of set dots of a packed row as (x, width) tuples
+    # if single is True, each set dot is a run of its own
+    return [(match.start(), match.end() - match.start()) for match in _runs_patterns[single].finditer(format(row | (1 << width), "b")[1:])]
+
+
+def _rectangles(rows, width):
+    # returns the set dots of packed rows as (x, y, width, height) rectangles,
+    # by merging runs of dots in a row with identical runs in the next rows
+    result = []
+    open_rectangles = {}  # run : y of the top
+    for y, row in enumerate(rows):
+        runs = set(_runs(row, width))
+        for run in [run for run in open_rectangles if run not in runs]:
+            y_top = open_rectangles.pop(run)
+            result.append((run[0], y_top, run[1], y - y_top))
+        for run in runs:
+            open_rectangles.setdefault(run, y)
+    for run, y_top in open_rectangles.items():
+        result.append((run[0], y_top, run[1], len(rows) - y_top))
+    return sorted(result, key=lambda rectangle: (rectangle[1], rectangle[0]))
+
+
+def _contours(rows, width):
+    # returns the outlines of the set dots of packed rows as lists of vertices (clockwise, holes counterclockwise)
+    def is_set(x, y):
+        return 0 <= y < len(rows) and 0 <= x < width and (rows[y] >> (width - 1 - x)) & 1
+
+    outgoing = collections.defaultdict(list)  # start vertex : end vertices of the edges, with the set dots at the right hand side
+    for y, row in enumerate(rows):
+        for x, _ in _runs(row, width, single=True):
+            if not is_set(x, y - 1):
+                outgoing[x, y].append((x + 1, y))
+            if not is_set(x + 1, y):
+                outgoing[x + 1, y].append((x + 1, y + 1))
+            if not is_set(x, y + 1):
+                outgoing[x + 1, y + 1].append((x, y + 1))
+            if not is_set(x - 1, y):
+                outgoing[x, y + 1].append((x, y))
+
+    result = []
+    for start in sorted(outgoing, key=lambda vertex: (vertex[1], vertex[0])):
+        while outgoing.get(start):
+            first_end = outgoing[start].pop()
+            vertex = start
+            end = first_end
+            direction = None
+            contour = []
+            while True:
+                new_direction = (end[0] - vertex[0], end[1] - vertex[1])
+                if new_direction != direction:
+                    contour.append(vertex)
+                direction = new_direction
+                vertex = end
+                candidates = outgoing.get(vertex, [])
+                if vertex == start:
+                    candidates = candidates + [first_end]
+                # at a vertex shared by diagonally touching dots, turn right (towards the set dots) to keep the outlines separate
+                dx, dy = direction
+                for turn in ((-dy, dx), (dx, dy), (dy, -dx)):
+                    end = (vertex[0] + turn[0], vertex[1] + turn[1])
+                    if end in candidates:
+                        break
+                if vertex == start and end == first_end:
+                    break
+                outgoing[vertex].remove(end)
+            if (first_end[0] - start[0], first_end[1] - start[1]) == direction:
+                contour.pop(0)
+            result.append(contour)
+    return result
+
+
+_scaled_bits_tables = {}
+
+
+def _scaled_row_bytes(row, width, scale):
+    # converts a packed row into bytes, with each dot repeated scale times, padded with 0 bits to a multiple of 8
+    try:
+        table = _scaled_bits_tables[scale]
+    except KeyError:
+        table = tuple(int("".join(bit * scale for bit in format(i, "08b")), 2).to_bytes(scale, "big") for i in range(256))
+        _scaled_bits_tables[scale] = table
+    return b"".join(map(table.__getitem__, _row_to_bytes(row, width)))[: (width * scale + 7) // 8]
+
+
+_png_tiles = {}
+
+
+def _png_tile_rows(dot_size, gap, shape, on_color, off_color, background):
+    # returns the (cached) rows of the tiles of a dot, as (off pixels, on pixels), starting with the gap rows
+    key = (dot_size, gap, shape, on_color, off_color, background)
+    try:
+        return _png_tiles[key]
+    except KeyError:
+        pass
+    if shape not in ("square", "round"):
+        raise ValueError("shape is not square or round")
+    radius = dot_size / 2
+    tile_rows = [(bytes(background) * (gap + dot_size),) * 2 for _ in range(gap)]
+    for y in range(dot_size):
+        tile_row = []
+        for color in (off_color, on_color):
+            pixels = [bytes(background)] * gap
+            for x in range(dot_size):
+                inside = shape == "square" or (x + 0.5 - radius) ** 2 + (y + 0.5 - radius) ** 2 <= radius**2
+                pixels.append(bytes(color) if inside else bytes(background))
+            tile_row.append(b"".join(pixels))
+        tile_rows.append(tuple(tile_row))
+    _png_tiles[key] = tile_rows
+    return tile_rows
+
+
+def _png(width, height, scanlines, color_type=2):
+    # returns a PNG image (8 bits per sample) of the given scanlines (without filter type bytes)
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    compressor = zlib.compressobj()
+    data = [compressor.compress(b"\x00" + scanline) for scanline in scanlines]
+    data.append(compressor.flush())
+    return b"".join(
+        (
+            b"\x89PNG\r\n\x1a\n",
+            chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)),
+            chunk(b"IDAT", b"".join(data)),
+            chunk(b"IEND", b""),
+        )
+    )
+
+
+def _half_block_lines(rows, width):
+    # converts packed rows into strings of half block characters, each representing two rows
+    rows = list(rows) + [0] * (len(rows) % 2)
+    return [
+        (int.from_bytes(_unpack_row(top, width), "big") | int.from_bytes(_unpack_row(bottom, width), "big") << 1).to_bytes(width, "big").decode("latin-1").translate(_HALF_BLOCKS)
+        for top, bottom in zip(rows[::2], rows[1::2])
+    ]
+
+
+def _ansi_colors(color, background):
+    # returns the ansi escape sequence to select the given (24 bits) foreground and background colors
+    result = ""
+    if color is not None:
+        result += "\x1b[38;2;{};{};{}m".format(*color)
+    if background is not None:
+        result += "\x1b[48;2;{};{};{}m".format(*background)
+    return result
+
+
+class RenderOptions:
+    """
+    immutable, validated set of options for rendering, as used by grid
+
+    The options are validated (and align is normalized to "c", "l" or "r") only once, on creation.
+    A RenderOptions object can be unpacked as keyword arguments, e.g. fiftydots.grid(s, **options).
+
+    Parameters
+    ----------
+    default, intra, proportional, width, align, narrow
+        see grid
+    """
+
+    __slots__ = ("default", "intra", "proportional", "width", "align", "narrow")
+
+    def __init__(self, default=" ", intra=1, proportional=False, width=None, align="c", narrow=False):
+        if len(default) != 1:
+            raise ValueError("len of default is not 1")
+        align = align.lower()[:1]
+        if align not in ("c", "l", "r"):
+            raise ValueError("align does not start with c, l or r")
+        for name, value in zip(self.__slots__, (default, max(intra, 0), bool(proportional), width, align, bool(narrow))):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RenderOptions is immutable")
+
+    def replace(self, **options):
+        """
+        returns a copy with the given options changed
+
+        Returns
+        -------
+        render options : RenderOptions
+        """
+        return RenderOptions(**{**dict(self.items()), **options})
+
+    def keys(self):
+        return self.__slots__
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.__slots__]
+
+    def __getitem__(self, name):
+        if name not in self.__slots__:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __eq__(self, other):
+        if not isinstance(other, RenderOptions):
+            return NotImplemented
+        return self.items() == other.items()
+
+    def __hash__(self):
+        return hash(tuple(self.items()))
+
+    def __repr__(self):
+        return "RenderOptions({})".format(", ".join(f"{name}={value!r}" for name, value in self.items()))
+
+
+class Renderer:
+    """
+    renderer of texts in a font with fixed, pre-validated options
+
+    The glyphs of all characters of the font are prepared for exactly these options on creation,
+    so rendering many (short) texts has no per call argument handling.
+
+    Normally, a Renderer is created with the renderer method of a font.
+    Calling a renderer with a text gives the same result as grid of the font with the same options.
+
+    Parameters
+    ----------
+    font : _Dots
+        font to use, e.g. fiftydots
+
+    options : RenderOptions
+        options to render with
+    """
+
+    __slots__ = ("_font", "_options", "_glyphs", "_blank", "_height")
+
+    def __init__(self, font, options):
+        self._font = font
+        self._options = options
+        self._glyphs = {c: font._packed_char(c, proportional=options.proportional, narrow=options.narrow)[::2] for c in font._chartable}
+        self._blank = self._glyphs.get(options.default)  # None if the font has no default character
+        self._height = font.height()
+
+    def options(self):
+        """
+        options of this renderer
+
+        Returns
+        -------
+            options : RenderOptions
+        """
+        return self._options
+
+    def rows(self, s):
+        """
+        returns the text s as packed rows
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        Returns
+        -------
+        the width and the packed rows (leftmost dot as most significant bit) : tuple of int and list of ints
+        """
+        glyphs = [self._glyphs.get(c, self._blank) for c in s]
+        if None in glyphs:
+            raise KeyError(self._options.default)
+        if glyphs:
+            gap = self._options.intra * "0"
+            actual_width = sum(glyph[0] for glyph in glyphs) + (len(glyphs) - 1) * self._options.intra
+            rows = [int(gap.join([glyph[1][y] for glyph in glyphs]), 2) for y in range(self._height)]
+        else:
+            actual_width, rows = 0, [0] * self._height
+        width = self._options.width
+        if width is None:
+            return actual_width, rows
+        shift = width - actual_width - _Dots._align_offset(actual_width, width, self._options.align)
+        mask = (1 << width) - 1
+        if shift >= 0:
+            return width, [(row << shift) & mask for row in rows]
+        return width, [(row >> -shift) & mask for row in rows]
+
+    def __call__(self, s):
+        """
+        returns a list of boolean lists to represent the text s, as grid does
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        Returns
+        -------
+        the representation of s : list of boolean lists
+        each set dot will be True, not set False
+        """
+        width, rows = self.rows(s)
+        return _rows_to_grid(rows, width)
+
+    def bitmap(self, s):
+        """
+        returns the text s as an immutable bitmap
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        Returns
+        -------
+        the representation of s : Bitmap
+        """
+        width, rows = self.rows(s)
+        return Bitmap.from_rows(rows, width)
+
+
+class Bitmap:
+    """
+    immutable bitmap of set and not set dots, stored as packed bytes
+
+    Each row is stored as (width + 7) // 8 bytes, with the leftmost dot as the most significant bit
+    of the first byte (as in PBM files). Unused bits at the end of a row are 0.
+
+    Indexing is done as [y] (a row as a tuple of bools), [y, x] (a dot as bool),
+    or with slices, like [y_start:y_end] or [y_start:y_end, x_start:x_end], that return a view
+    on the same data, without copying.
+
+    Normally, a Bitmap is created with the bitmap method of a font or canvas, or with from_rows.
+
+    Parameters
+    ----------
+    width : int
+        width of the bitmap in dots
+
+    height : int
+        height of the bitmap in dots
+
+    data : bytes-like
+        height * ((width + 7) // 8) bytes with the packed rows
+    """
+
+    __slots__ = ("_data", "_stride", "_base_width", "_x", "_y", "_width", "_height")
+
+    def __init__(self, width, height, data):
+        data = memoryview(bytes(data))
+        stride = (width + 7) // 8
+        if len(data) != height * stride:
+            raise ValueError(f"data should be {height * stride} bytes, not {len(data)}")
+        self._data = data
+        self._stride = stride
+        self._base_width = width
+        self._x = 0
+        self._y = 0
+        self._width = width
+        self._height = height
+
+    @classmethod
+    def from_rows(cls, rows, width):
+        """
+        creates a bitmap from packed rows
+
+        Parameters
+        ----------
+        rows : iterable of int
+            packed rows, each with the leftmost dot as most significant bit
+
+        width : int
+            width of the rows in dots
+
+        Returns
+        -------
+        bitmap : Bitmap
+        """
+        rows = list(rows)
+        return cls(width, len(rows), b"".join(_row_to_bytes(row, width) for row in rows))
+
+    def _view(self, x, y, width, height):
+        view = object.__new__(Bitmap)
+        view._data = self._data
+        view._stride = self._stride
+        view._base_width = self._base_width
+        view._x = self._x + x
+        view._y = self._y + y
+        view._width = width
+        view._height = height
+        return view
+
+    def width(self):
+        """
+        width of this bitmap
+
+        Returns
+        -------
+            width : int
+        """
+        return self._width
+
+    def height(self):
+        """
+        height of this bitmap
+
+        Returns
+        -------
+            height : int
+        """
+        return self._height
+
+    def __len__(self):
+        return self._height
+
+    def __repr__(self):
+        return f"Bitmap(width={self._width}, height={self._height})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+        return self._width == other._width and self.rows() == other.rows()
+
+    def __hash__(self):
+        return hash((self._width, tuple(self.rows())))
+
+    @staticmethod
+    def _range(index, length):
+        # returns (start, size) of a slice, that should have no step
+        start, stop, step = index.indices(length)
+        if step != 1:
+            raise ValueError("slices with a step are not supported")
+        return start, max(stop - start, 0)
+
+    @staticmethod
+    def _index(index, length):
+        if not -length <= index < length:
+            raise IndexError("bitmap index out of range")
+        return index % length
+
+    def __getitem__(self, index):
+        y_index, x_index = index if isinstance(index, tuple) else (index, slice(None))
+        if isinstance(y_index, slice) or isinstance(x_index, slice):
+            y, height = self._range(y_index, self._height) if isinstance(y_index, slice) else (self._index(y_index, self._height), 1)
+            x, width = self._range(x_index, self._width) if isinstance(x_index, slice) else (self._index(x_index, self._width), 1)
+            view = self._view(x, y, width, height)
+            if isinstance(y_index, slice):
+                return view
+            return tuple(_rows_to_grid([view.row(0)], width)[0])
+        x = self._index(x_index, self._width)
+        return bool((self.row(y_index) >> (self._width - 1 - x)) & 1)
+
+    def row(self, y):
+        """
+        returns a row as a packed int
+
+        Parameters
+        ----------
+        y : int
+            row number (may be negative)
+
+        Returns
+        -------
+        the row, with the leftmost dot as most significant bit : int
+        """
+        offset = (self._y + self._index(y, self._height)) * self._stride
+        row = int.from_bytes(self._data[offset : offset + self._stride], "big")
+        return (row >> (self._stride * 8 - self._x - self._width)) & ((1 << self._width) - 1)
+
+    def column(self, x):
+        """
+        returns a column as a packed int
+
+        Parameters
+        ----------
+        x : int
+            column number (may be negative)
+
+        Returns
+        -------
+        the column, with the top dot as least significant bit : int
+        """
+        shift = self._width - 1 - self._index(x, self._width)
+        return sum(((row >> shift) & 1) << y for y, row in enumerate(self.rows()))
+
+    def rows(self):
+        """
+        returns the packed rows of the bitmap
+
+        Returns
+        -------
+        list of ints, each with the leftmost dot as most significant bit : list
+        """
+        return [self.row(y) for y in range(self._height)]
+
+    def to_list(self):
+        """
+        returns a list of boolean lists to represent the bitmap, as returned by grid
+
+        Returns
+        -------
+        the representation of the bitmap : list of boolean lists
+        each set dot will be True, not set False
+        """
+        return _rows_to_grid(self.rows(), self._width)
+
+    def _combine(self, other, operation):
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+        if (self._width, self._height) != (other._width, other._height):
+            raise ValueError(f"bitmaps of {self._width}x{self._height} and {other._width}x{other._height} dots can't be combined")
+        return Bitmap.from_rows(map(operation, self.rows(), other.rows()), self._width)
+
+    def __or__(self, other):
+        return self._combine(other, operator.or_)
+
+    def __and__(self, other):
+        return self._combine(other, operator.and_)
+
+    def __xor__(self, other):
+        return self._combine(other, operator.xor)
+
+    def __invert__(self):
+        mask = (1 << self._width) - 1
+        return Bitmap.from_rows((row ^ mask for row in self.rows()), self._width)
+
+    def shift(self, dx=0, dy=0):
+        """
+        returns the bitmap with its contents shifted (translated), with the same size
+
+        Dots shifted outside the bitmap are lost, the vacated dots are not set.
+
+        Parameters
+        ----------
+        dx : int
+            number of dots to shift to the right (negative to the left)
+
+        dy : int
+            number of dots to shift down (negative up)
+
+        Returns
+        -------
+        the shifted bitmap : Bitmap
+        """
+        mask = (1 << self._width) - 1
+        rows = [(row >> dx if dx >= 0 else row << -dx) & mask for row in self.rows()]
+        if dy >= 0:
+            rows = [0] * min(dy, self._height) + rows[: max(self._height - dy, 0)]
+        else:
+            rows = rows[-dy:] + [0] * min(-dy, self._height)
+        return Bitmap.from_rows(rows, self._width)
+
+    def __lshift__(self, n):
+        return self.shift(dx=-n)
+
+    def __rshift__(self, n):
+        return self.shift(dx=n)
+
+    def memoryview(self):
+        """
+        returns the packed rows as a (read only) memoryview
+
+        If the bitmap is not a view or a view of complete rows, no data is copied.
+        Otherwise, the packed rows of the view are copied first.
+
+        Returns
+        -------
+        height * ((width + 7) // 8) bytes with the packed rows : memoryview
+        """
+        if self._x == 0 and self._width == self._base_width:
+            return self._data[self._y * self._stride : (self._y + self._height) * self._stride]
+        return memoryview(b"".join(_row_to_bytes(row, self._width) for row in self.rows()))
+
+    def __buffer__(self, flags):
+        return self.memoryview()
+
+    def __bytes__(self):
+        return bytes(self.memoryview())
+
+
+class Canvas:
+    """
+    a persistent dot matrix (framebuffer) of a given size, stored as packed rows
+
+    Texts in any of the fonts can be put on the canvas, reusing the cached glyphs of that font.
+    All changes are tracked, so only the changed regions have to be sent to a display.
+
+    Parameters
+    ----------
+    width : int
+        width of the canvas in dots
+
+    height : int
+        height of the canvas in dots
+    """
+
+    def __init__(self, width, height):
+        self._width = width
+        self._height = height
+        self._rows = [0] * height
+        self._dirty = []
+
+    def width(self):
+        """
+        width of this canvas
+
+        Returns
+        -------
+            width : int
+        """
+        return self._width
+
+    def height(self):
+        """
+        height of this canvas
+
+        Returns
+        -------
+            height : int
+        """
+        return self._height
+
+    def _put(self, x, y, width, rows, track=True):
+        # overwrites the area at (x, y) with the given packed rows (of the given width), clipped to the canvas
+        # if track is False, the changed region is not added to the dirty regions
+        x_start = max(x, 0)
+        x_end = min(x + width, self._width)
+        if x_start >= x_end:
+            return
+        area_mask = ((1 << (x_end - x_start)) - 1) << (self._width - x_end)
+        shift = self._width - x - width
+        changed = 0
+        y_changed = []
+        for y_row, row in enumerate(rows, y):
+            if 0 <= y_row < self._height:
+                placed = (row << shift if shift >= 0 else row >> -shift) & area_mask
+                old = self._rows[y_row]
+                new = (old & ~area_mask) | placed
+                if new != old:
+                    self._rows[y_row] = new
+                    changed |= old ^ new
+                    y_changed.append(y_row)
+        if changed and track:
+            x_first = self._width - changed.bit_length()
+            x_last = self._width - (changed & -changed).bit_length()
+            self._dirty.append((x_first, y_changed[0], x_last - x_first + 1, y_changed[-1] - y_changed[0] + 1))
+
+    def text(self, font, s, x=0, y=0, **grid_options):
+        """
+        puts the text s in the given font on the canvas
+
+        The area covered by the text is overwritten, so including the non set dots.
+        Anything outside the canvas is clipped.
+
+        Parameters
+        ----------
+        font : _Dots
+            font to use, e.g. fiftydots
+
+        s : str
+            string to represent
+
+        x : int
+            x-coordinate of the left side of the text (default 0)
+
+        y : int
+            y-coordinate of the top of the text (default 0)
+
+        all parameters for grid may be given as well
+
+        Returns
+        -------
+        the width (in dots) of the text : int
+        """
+        width, rows = font._packed(s, **grid_options)
+        self._put(x, y, width, rows)
+        return width
+
+    def clear_rect(self, x, y, width, height):
+        """
+        clears (sets to not set) all dots in the given rectangle
+
+        Parameters
+        ----------
+        x : int
+            x-coordinate of the left side of the rectangle
+
+        y : int
+            y-coordinate of the top of the rectangle
+
+        width : int
+            width of the rectangle
+
+        height : int
+            height of the rectangle
+        """
+        self._put(x, y, width, [0] * height)
+
+    def clear(self):
+        """
+        clears all dots of the canvas
+        """
+        self.clear_rect(0, 0, self._width, self._height)
+
+    def dirty_regions(self):
+        """
+        returns the regions that have changed since the previous call (or the creation of the canvas)
+
+        Operations that do not change any dot do not result in a region.
+
+        Returns
+        -------
+        list of regions (x, y, width, height) : list of tuples
+        """
+        result = self._dirty
+        self._dirty = []
+        return result
+
+    def rows(self):
+        """
+        returns the packed rows of the canvas
+
+        Returns
+        -------
+        list of ints, each with the leftmost dot as most significant bit : list
+        """
+        return self._rows[:]
+
+    def grid(self):
+        """
+        returns a list of boolean lists to represent the canvas
+
+        Returns
+        -------
+        the representation of the canvas : list of boolean lists
+        each set dot will be True, not set False
+        """
+        return _rows_to_grid(self._rows, self._width)
+
+    def bitmap(self):
+        """
+        returns the canvas as an immutable bitmap
+
+        Returns
+        -------
+        the representation of the canvas : Bitmap
+        """
+        return Bitmap.from_rows(self._rows, self._width)
+
+
+class CounterRenderer:
+    """
+    incremental renderer for texts with a fixed layout, like clocks, timers and counters
+
+    Each character occupies a fixed cell. On an update only the cells with a changed character are rendered,
+    reusing the previous frame.
+
+    Parameters
+    ----------
+    font : _Dots
+        font to use, e.g. fifteendots
+
+    default : str
+        if a character has no representation in the font, it will be replaced
+        with default, that is a blank by default
+        if the length is not 1, a ValueError will be raised
+
+    intra : int
+        number of dots between characters
+        default is 1
+
+    proportional : bool
+        if proportional is False (default), all cells will have the width of the font
+        if proportional is True, digits will have the width of the widest digit (tabular digits)
+        and all other characters their actual width
+
+    narrow : bool
+        if False (default), blanks will be 2 wide when proportional is True
+        if True, blanks will be 1 wide when proportional is True
+    """
+
+    def __init__(self, font, default=" ", intra=1, proportional=False, narrow=False):
+        if len(default) != 1:
+            raise ValueError("len of default is not 1")
+        self._font = font
+        self._default = default
+        self._intra = max(intra, 0)
+        self._proportional = proportional
+        self._narrow = narrow
+        self._digit_width = max((font._packed_char(c, proportional=True)[0] for c in "0123456789" if font.has_char(c)), default=0)
+        self._chars = ""
+        self._xs = []
+        self._widths = []
+        self._canvas = Canvas(0, font.height())
+
+    def _cell(self, c):
+        if not self._font.has_char(c):
+            c = self._default
+        width, rows, _ = self._font._packed_char(c, proportional=self._proportional, narrow=self._narrow)
+        if self._proportional and c in "0123456789":
+            shift = (self._digit_width - width) - (self._digit_width - width) // 2
+            return self._digit_width, [row << shift for row in rows]
+        return width, rows
+
+    def update(self, s):
+        """
+        renders the string s, only rendering the cells that differ from the previous update
+
+        If the layout changes (different number of characters or a different cell width), all cells will be rendered.
+
+        Parameters
+        ----------
+        s : str
+            string to represent
+
+        Returns
+        -------
+        the changed cells as (index, x, width) : list of tuples
+        """
+        if len(s) == len(self._chars):
+            changed = [i for i, (c, previous) in enumerate(zip(s, self._chars)) if c != previous]
+            cells = {i: self._cell(s[i]) for i in changed}
+            if all(cells[i][0] == self._widths[i] for i in changed):
+                for i in changed:
+                    self._canvas._put(self._xs[i], 0, *cells[i], track=False)
+                self._chars = s
+                return [(i, self._xs[i], self._widths[i]) for i in changed]
+
+        cells = [self._cell(c) for c in s]
+        self._widths = [width for width, _ in cells]
+        self._xs = []
+        x = 0
+        for width in self._widths:
+            self._xs.append(x)
+            x += width + self._intra
+        self._canvas = Canvas(max(x - self._intra, 0), self._font.height())
+        for x, (width, rows) in zip(self._xs, cells):
+            self._canvas._put(x, 0, width, rows, track=False)
+        self._chars = s
+        return [(i, x, width) for i, (x, width) in enumerate(zip(self._xs, self._widths))]
+
+    def width(self):
+        """
+        width of the current frame
+
+        Returns
+        -------
+            width : int
+        """
+        return self._canvas.width()
+
+    def height(self):
+        """
+        height of the frame (the height of the font)
+
+        Returns
+        -------
+            height : int
+        """
+        return self._canvas.height()
+
+    def rows(self):
+        """
+        returns the packed rows of the current frame
+
+        Returns
+        -------
+        list of ints, each with the leftmost dot as most significant bit : list
+        """
+        return self._canvas.rows()
+
+    def grid(self):
+        """
+        returns a list of boolean lists to represent the current frame
+
+        Returns
+        -------
+        the representation of the current frame : list of boolean lists
+        each set dot will be True, not set False
+        """
+        return self._canvas.grid()
+
+
+_max7219_tables = {}
+
+
+class Max7219Chain:
+    """
+    encoder for a chain of MAX7219 driven 8 * 8 led modules
+
+    The text is split into 8 * 8 tiles, one per module, which are converted to the register writes of the chain.
+    The mapping of the tile dots to the register bits is precomputed once per geometry (rotation and flip).
+
+    Parameters
+    ----------
+    modules : int
+        number of modules in the chain
+
+    rotation : int
+        rotation (clockwise, in degrees) of the image on each module: 0 (default), 90, 180 or 270
+
+    flip : bool
+        if False (default), the leftmost dot of a row will be the most significant bit of the register
+        if True, the image is mirrored, so the leftmost dot of a row will be the least significant bit of the register
+
+    reverse : bool
+        if False (default), the first module of the chain (the one connected to the controller) is the leftmost module
+        if True, the first module of the chain is the rightmost module
+    """
+
+    def __init__(self, modules, rotation=0, flip=False, reverse=False):
+        if rotation not in (0, 90, 180, 270):
+            raise ValueError("rotation is not 0, 90, 180 or 270")
+        self._modules = modules
+        self._reverse = reverse
+        key = (rotation, bool(flip))
+        if key not in _max7219_tables:
+            _max7219_tables[key] = self._build_table(rotation, flip)
+        self._row_tables = _max7219_tables[key]
+
+    @staticmethod
+    def _build_table(rotation, flip):
+        # returns for each row y of a tile and each value of that row (leftmost dot as most significant bit)
+        # the register contents as a 64 bits int (register 1 as most significant byte)
+        table = []
+        for y in range(8):
+            bits = []
+            for x in range(8):
+                xx = 7 - x if flip else x
+                yy = y
+                for _ in range(rotation // 90):
+                    xx, yy = 7 - yy, xx
+                bits.append(1 << ((7 - yy) * 8 + 7 - xx))
+            row_table = [0] * 256
+            for value in range(1, 256):
+                lowest = value & -value
+                row_table[value] = row_table[value ^ lowest] | bits[8 - lowest.bit_length()]
+            table.append(row_table)
+        return table
+
+    def modules(self):
+        """
+        number of modules in the chain
+
+        Returns
+        -------
+            modules : int
+        """
+        return self._modules
+
+    def encode_rows(self, rows):
+        """
+        returns the register writes to show the given packed rows on the chain
+
+        Parameters
+        ----------
+        rows : list of int
+            8 rows of 8 * modules dots, with the leftmost dot as most significant bit (e.g. Canvas.rows())
+
+        Returns
+        -------
+        for each of the registers 1 to 8 the bytes to shift into the chain : list of bytes
+        each consists of a (register, data) pair per module, the pair for the last module of the chain first
+        """
+        row_bytes = [row.to_bytes(self._modules, "big") for row in rows]
+        tiles = []
+        for tile in range(self._modules):
+            value = 0
+            for row_table, row in zip(self._row_tables, row_bytes):
+                value |= row_table[row[tile]]
+            tiles.append(value.to_bytes(8, "big"))
+        if not self._reverse:
+            tiles.reverse()
+        return [bytes(itertools.chain.from_iterable((register + 1, tile[register]) for tile in tiles)) for register in range(8)]
+
+    def encode(self, font, s, y=0, align="l", **kwargs):
+        """
+        returns the register writes to show the text s on the chain
+
+        Parameters
+        ----------
+        font : _Dots
+            font to use, e.g. twentyfourdots
+
+        s : str
+            string to represent
+
+        y : int
+            y-coordinate of the top of the text (default 0)
+
+        align : str
+            if align starts with a l (default), the result will be left aligned
+            if align starts with a c, the result will be centered
+            if align starts with a r, the result will be right aligned
+
+        all parameters for grid, apart from width, may be given as well
+
+        Returns
+        -------
+        for each of the registers 1 to 8 the bytes to shift into the chain : list of bytes
+        each consists of a (register, data) pair per module, the pair for the last module of the chain first
+        """
+        _, rows = font._packed(s, width=self._modules * 8, align=align, **kwargs)
+        return self.encode_rows([rows[row - y] if 0 <= row - y < len(rows) else 0 for row in range(8)])
+
+
+class Hub75Frame:
+    """
+    frame for HUB75 style rgb led panels, built from colored texts
+
+    The frame is stored as packed rows per color channel and bit, so putting a text on the frame
+    costs a few integer operations per row. The bit planes are vectorized with numpy, if available.
+
+    Parameters
+    ----------
+    width : int
+        width of the panel in dots
+
+    height : int
+        height of the panel in dots (should be even)
+
+    bit_depth : int
+        number of bits per color channel (1-8, default 8)
+        the most significant bits of the (8 bits) colors are used
+    """
+
+    def __init__(self, width, height, bit_depth=8):
+        if height % 2:
+            raise ValueError("height is not even")
+        if not 1 <= bit_depth <= 8:
+            raise ValueError("bit_depth is not in range 1-8")
+        self._width = width
+        self._height = height
+        self._bit_depth = bit_depth
+        self.clear()
+
+    def width(self):
+        """
+        width of this frame
+
+        Returns
+        -------
+            width : int
+        """
+        return self._width
+
+    def height(self):
+        """
+        height of this frame
+
+        Returns
+        -------
+            height : int
+        """
+        return self._height
+
+    def clear(self):
+        """
+        sets all dots of the frame to black
+        """
+        self._planes = [[[0] * self._height for _ in range(self._bit_depth)] for _ in range(3)]
+
+    def text(self, font, s, x=0, y=0, color=(255, 255, 255), **kwargs):
+        """
+        puts the text s in the given font and color on the frame
+
+        The set dots get the given color, the non set dots are left unchanged.
+        Anything outside the frame is clipped.
+
+        Parameters
+        ----------
+        font : _Dots
+            font to use, e.g. fiftydots
+
+        s : str
+            string to represent
+
+        x : int
+            x-coordinate of the left side of the text (default 0)
+
+        y : int
+            y-coordinate of the top of the text (default 0)
+
+        color : tuple of 3 ints
+            red, green and blue value (0-255) of the text
+            default: (255, 255, 255)
+
+        all parameters for grid may be given as well
+
+        Returns
+        -------
+        the width (in dots) of the text : int
+        """
+        width, rows = font._packed(s, **kwargs)
+        shift = self._width - x - width
+        mask = (1 << self._width) - 1
+        values = [component >> (8 - self._bit_depth) for component in color]
+        for y_row, row in enumerate(rows, y):
+            if 0 <= y_row < self._height:
+                placed = (row << shift if shift >= 0 else row >> -shift) & mask
+                if placed:
+                    for value, channel in zip(values, self._planes):
+                        for bit, plane in enumerate(channel):
+                            if (value >> bit) & 1:
+                                plane[y_row] |= placed
+                            else:
+                                plane[y_row] &= ~placed
+        return width
+
+    def bitplanes(self):
+        """
+        returns the bit planes of the frame in HUB75 format
+
+        There is a plane for each bit (least significant bit first). Each plane contains for each of the height / 2 scan rows
+        one byte per column, with bits 0, 1 and 2 the red, green and blue value of a dot in the upper half
+        and bits 3, 4 and 5 the red, green and blue value of the corresponding dot in the lower half.
+
+        Returns
+        -------
+        bit_depth * height / 2 * width bytes : bytes
+        """
+        if numpy is None:
+            return self._bitplanes_python()
+        return self._bitplanes_numpy()
+
+    def _bitplanes_python(self):
+        half = self._height // 2
+        result = []
+        for bit in range(self._bit_depth):
+            planes = [channel[bit] for channel in self._planes]
+            for y in range(half):
+                value = 0
+                for shift, y_row in ((0, y), (3, y + half)):
+                    for channel, plane in enumerate(planes):
+                        value |= int.from_bytes(_unpack_row(plane[y_row], self._width), "big") << (shift + channel)
+                result.append(value.to_bytes(self._width, "big"))
+        return b"".join(result)
+
+    def _bitplanes_numpy(self):
+        number_of_bytes = (self._width + 7) // 8
+        half = self._height // 2
+        result = numpy.zeros((self._bit_depth, half, self._width), dtype=numpy.uint8)
+        for channel, channel_planes in enumerate(self._planes):
+            packed = b"".join(_row_to_bytes(row, self._width) for plane in channel_planes for row in plane)
+            bits = numpy.unpackbits(numpy.frombuffer(packed, dtype=numpy.uint8).reshape(self._bit_depth, self._height, number_of_bytes), axis=2)
+            bits = bits[:, :, : self._width]
+            result |= bits[:, :half] << channel
+            result |= bits[:, half:] << (channel + 3)
+        return result.tobytes()
+
+
+class AnsiDisplay:
+    """
+    live updating terminal display, with two rows of dots per line (see grid_to_ansi)
+
+    Each update only emits the cursor moves and characters needed to change the previous frame into the new one.
+
+    Parameters
+    ----------
+    line : int
+        terminal line (1 based) of the top of the display (default 1)
+
+    column : int
+        terminal column (1 based) of the left side of the display (default 1)
+
+    color : tuple of 3 ints
+        red, green and blue value (0-255) of the set dots
+        if None (default), the terminal's foreground color is used
+
+    background : tuple of 3 ints
+        red, green and blue value (0-255) of the non set dots
+        if None (default), the terminal's background color is used
+    """
+
+    def __init__(self, line=1, column=1, color=None, background=None):
+        self._line = line
+        self._column = column
+        self._colors = _ansi_colors(color, background)
+        self._lines = None
+
+    def update(self, font, s, **kwargs):
+        """
+        returns the output to change the display into the text s in the given font
+
+        The first update draws all lines.
+
+        Parameters
+        ----------
+        font : _Dots
+            font to use, e.g. fiftydots
+
+        s : str
+            string to represent
+
+        all parameters for grid may be given as well
+
+        Returns
+        -------
+        ansi escape sequences and characters to write to the terminal : str
+        """
+        width, rows = font._packed(s, **kwargs)
+        return self.update_rows(rows, width)
+
+    def update_rows(self, rows, width):
+        """
+        returns the output to change the display into the given packed rows, like the rows() of a Canvas
+
+        Parameters
+        ----------
+        rows : list of int
+            rows of the given width, with the leftmost dot as most significant bit
+
+        width : int
+            width of the rows
+
+        Returns
+        -------
+        ansi escape sequences and characters to write to the terminal : str
+        """
+        lines = _half_block_lines(rows, width)
+        previous = self._lines
+        self._lines = lines
+        output = []
+        if previous is None:
+            for y, line in enumerate(lines):
+                output.append(f"\x1b[{self._line + y};{self._column}H{line}")
+        else:
+            for y in range(max(len(lines), len(previous))):
+                old = previous[y] if y < len(previous) else ""
+                new = lines[y] if y < len(lines) else ""
+                length = max(len(old), len(new))
+                old = old.ljust(length)
+                new = new.ljust(length)
+                segment_start = None
+                segment_end = 0
+                for x, (old_char, new_char) in enumerate(zip(old, new)):
+                    if old_char != new_char:
+                        if segment_start is None:
+                            segment_start = x
+                        elif x - segment_end > 4:  # a gap is cheaper to overwrite than a cursor move
+                            output.append(f"\x1b[{self._line + y};{self._column + segment_start}H{new[segment_start:segment_end]}")
+                            segment_start = x
+                        segment_end = x + 1
+                if segment_start is not None:
+                    output.append(f"\x1b[{self._line + y};{self._column + segment_start}H{new[segment_start:segment_end]}")
+        if output and self._colors:
+            return self._colors + "".join(output) + "\x1b[0m"
+        return "".join(output)
+
+
+_strip_orders = {}
+
+
+def _strip_order(width, height, origin="top-left", orientation="rows", serpentine=True):
+    # returns a (cached) function that permutes a sequence of dots in row order (y * width + x) into strip order
+    key = (width, height, origin, orientation, bool(serpentine))
+    try:
+        return _strip_orders[key]
+    except KeyError:
+        pass
+    if origin not in ("top-left", "top-right", "bottom-left", "bottom-right"):
+        raise ValueError("origin is not top-left, top-right, bottom-left or bottom-right")
+    if orientation not in ("rows", "columns"):
+        raise ValueError("orientation is not rows or columns")
+    ys = range(height) if origin.startswith("top") else range(height - 1, -1, -1)
+    xs = range(width) if origin.endswith("left") else range(width - 1, -1, -1)
+    if orientation == "rows":
+        lines = [[(x, y) for x in (xs if not (serpentine and i % 2) else reversed(xs))] for i, y in enumerate(ys)]
+    else:
+        lines = [[(x, y) for y in (ys if not (serpentine and i % 2) else reversed(ys))] for i, x in enumerate(xs)]
+    indexes = [y * width + x for line in lines for x, y in line]
+    if len(indexes) == 1:
+        order = lambda dots: (dots[indexes[0]],)
+    elif indexes:
+        order = operator.itemgetter(*indexes)
+    else:
+        order = lambda dots: ()
+    _strip_orders[key] = order
+    return order
+
+
+def strip_map(width, height, origin="top-left", orientation="rows", serpentine=True):
+    """
+    mapping of the dots of an addressable led matrix to the index of the led on the strip
+
+    Parameters
+    ----------
+    width : int
+        width of the matrix
+
+    height : int
+        height of the matrix
+
+    origin : str
+        corner of the first led of the strip: "top-left" (default), "top-right", "bottom-left" or "bottom-right"
+
+    orientation : str
+        if "rows" (default), the strip runs along the rows
+        if "columns", the strip runs along the columns
+
+    serpentine : bool
+        if True (default), the direction of the strip alternates per row (column)
+        if False, all rows (columns) run in the same direction
+
+    Returns
+    -------
+    the strip index of each dot, to be indexed as [y][x] : tuple of tuples
+    """
+    order = _strip_order(width, height, origin, orientation, serpentine)
+    result = [0] * (width * height)
+    for strip_index, raster_index in enumerate(order(range(width * height))):
+        result[raster_index] = strip_index
+    return tuple(tuple(result[y * width : (y + 1) * width]) for y in range(height))
+
+
+def export_atlas(font, path, columns=16, padding=1):
+    """
+    exports all glyphs of a font as a single (grayscale) PNG atlas with a JSON metrics table
+
+    The atlas is generated deterministically, in the order of the font definition, with a cell of
+    width() * height() dots per glyph. The metrics are written to a file with the same name as the atlas,
+    but with the suffix .json. If both files exist and were generated from the same font and parameters,
+    they are not written again.
+
+    Parameters
+    ----------
+    font : _Dots
+        font to export, e.g. fiftydots
+
+    path : str or Path
+        file name of the atlas, e.g. "fiftydots.png"
+
+    columns : int
+        number of glyphs per row of the atlas
+        default: 16
+
+    padding : int
+        number of empty dots between (and around) the cells
+        default: 1
+
+    Returns
+    -------
+    the metrics : dict
+        name, width, height, atlas_width and atlas_height of the font and for each glyph (keyed by character):
+
+        - x, y: the position of the cell in the atlas
+        - proportional_offset: the first column of the cell that is used when proportional is True
+        - proportional_width: the width of the glyph when proportional is True
+        - narrow_width: the width of the glyph when proportional and narrow are True
+    """
+    path = Path(path)
+    metrics_path = path.with_suffix(".json")
+    chars = list(font._chartable)
+    packed_chars = [font._packed_char(c) for c in chars]
+
+    fingerprint = hashlib.sha256(json.dumps([font.name(), font.width(), font.height(), columns, padding, chars, [bits for _, _, bits in packed_chars]]).encode("utf-8")).hexdigest()
+    if path.is_file() and metrics_path.is_file():
+        try:
+            metrics = json.loads(metrics_path.read_text(encoding="utf-8"))
+        except ValueError:
+            metrics = {}
+        if metrics.get("fingerprint") == fingerprint:
+            return metrics
+
+    cell_width = font.width() + padding
+    cell_height = font.height() + padding
+    atlas_rows = (len(chars) + columns - 1) // columns
+    atlas_width = min(len(chars), columns) * cell_width + padding
+    atlas_height = atlas_rows * cell_height + padding
+    glyphs = {}
+    for i, (c, (width, rows, _)) in enumerate(zip(chars, packed_chars)):
+        used = 0
+        for row in rows:
+            used |= row
+        glyphs[c] = dict(
+            x=(i % columns) * cell_width + padding,
+            y=(i // columns) * cell_height + padding,
+            proportional_offset=width - used.bit_length() if used else 0,
+            proportional_width=font._packed_char(c, proportional=True)[0],
+            narrow_width=font._packed_char(c, proportional=True, narrow=True)[0],
+        )
+    metrics = dict(
+        name=font.name(),
+        width=font.width(),
+        height=font.height(),
+        atlas_width=atlas_width,
+        atlas_height=atlas_height,
+        fingerprint=fingerprint,
+        glyphs=glyphs,
+    )
+
+    def scanlines():
+        gray_levels = bytes.maketrans(b"\x00\x01", b"\x00\xff")
+        empty_line = bytes(atlas_width)
+        for atlas_row in range(atlas_rows):
+            for _ in range(padding):
+                yield empty_line
+            row_chars = packed_chars[atlas_row * columns : (atlas_row + 1) * columns]
+            for y in range(font.height()):
+                row = 0
+                for width, rows, _ in row_chars:
+                    row = (row << cell_width) | rows[y]
+                row <<= atlas_width - len(row_chars) * cell_width
+                yield _unpack_row(row, atlas_width).translate(gray_levels)
+        for _ in range(padding):
+            yield empty_line
+
+    path.write_bytes(_png(atlas_width, atlas_height, scanlines(), color_type=0))
+    metrics_path.write_text(json.dumps(metrics, indent=1), encoding="utf-8")
+    return metrics
+
+
+class PackedFont:
+    """
+    compact, packed representation of a font, e.g. for microcontroller firmware
+
+    Each glyph is stored as its used columns only (as in proportional mode), with ceil(height / 8) bytes
+    per column (top dot as least significant bit of the first byte). The glyph of chars[i] starts at data[offsets[i]]
+    and has widths[i] columns. lefts[i] is the position of the first used column in a cell of width dots.
+
+    Normally, a PackedFont is created with pack_font or from_module.
+    The grid method is a tiny decoder, that renders directly from the packed data.
+    """
+
+    def __init__(self, name, width, height, chars, offsets, widths, lefts, data):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.chars = chars
+        self.offsets = tuple(offsets)
+        self.widths = bytes(widths)
+        self.lefts = bytes(lefts)
+        self.data = bytes(data)
+        self.bytes_per_column = (height + 7) // 8
+
+    @classmethod
+    def from_module(cls, module):
+        """
+        creates a packed font from a module generated by to_python_module (or any object with the same attributes)
+
+        Parameters
+        ----------
+        module : module
+            module with name, width, height, chars, offsets, widths, lefts and data
+
+        Returns
+        -------
+        packed font : PackedFont
+        """
+        return cls(module.name, module.width, module.height, module.chars, module.offsets, module.widths, module.lefts, module.data)
+
+    def has_char(self, c):
+        """
+        availabiliy of character
+
+        Parameters
+        ----------
+        c : str
+            character to check
+
+        Returns
+        -------
+        True, if available; False, otherwise : bool
+        """
+        return len(c) == 1 and c in self.chars
+
+    def _columns(self, c, default, proportional, narrow):
+        if not self.has_char(c):
+            if not self.has_char(default):
+                raise KeyError(default)
+            c = default
+        i = self.chars.find(c)
+        start = self.offsets[i]
+        columns = [int.from_bytes(self.data[offset : offset + self.bytes_per_column], "little") for offset in range(start, start + self.widths[i] * self.bytes_per_column, self.bytes_per_column)]
+        if not proportional:
+            return [0] * self.lefts[i] + columns + [0] * (self.width - self.lefts[i] - self.widths[i])
+        return columns or [0] * (1 if narrow else 2)
+
+    def grid(self, s, default=" ", intra=1, proportional=False, width=None, align="c", narrow=False):
+        """
+        returns a list of boolean lists to represent the text s, decoded from the packed data
+
+        The parameters and result are the same as for grid of the fonts.
+        """
+        if len(default) != 1:
+            raise ValueError("len of default is not 1")
+        columns = []
+        for i, c in enumerate(s):
+            if i:
+                columns.extend([0] * max(intra, 0))
+            columns.extend(self._columns(c, default, proportional, narrow))
+        if width is not None:
+            offset = _Dots._align_offset(len(columns), width, align)
+            columns = [0] * offset + columns if offset >= 0 else columns[-offset:]
+            columns = columns[:width] + [0] * (width - len(columns))
+        return [[bool((column >> y) & 1) for column in columns] for y in range(self.height)]
+
+    def to_c_header(self, name=None):
+        """
+        returns the packed font as a C header
+
+        Parameters
+        ----------
+        name : str
+            prefix of the identifiers
+            if None (default), the name of the font
+
+        Returns
+        -------
+        C header : str
+        """
+        name = self.name if name is None else name
+
+        def array(values, per_line=16):
+            values = [f"0x{value:02x}" for value in values]
+            return ",\n".join("    " + ", ".join(values[i : i + per_line]) for i in range(0, len(values), per_line))
+
+        return "\n".join(
+            [
+                f"/* {self.name}, generated by ndots {__version__} */",
+                f"#ifndef NDOTS_{name.upper()}_H",
+                f"#define NDOTS_{name.upper()}_H",
+                "",
+                "#include <stdint.h>",
+                "",
+                f"#define {name.upper()}_WIDTH {self.width}",
+                f"#define {name.upper()}_HEIGHT {self.height}",
+                f"#define {name.upper()}_BYTES_PER_COLUMN {self.bytes_per_column}",
+                f"#define {name.upper()}_NUMBER_OF_CHARS {len(self.chars)}",
+                "",
+                "/* unicode code point of each glyph */",
+                f"static const uint32_t {name}_chars[] = {{\n{array(map(ord, self.chars), 8)}\n}};",
+                "",
+                "/* start of each glyph in data */",
+                f"static const uint16_t {name}_offsets[] = {{\n{array(self.offsets, 8)}\n}};",
+                "",
+                "/* number of columns of each glyph */",
+                f"static const uint8_t {name}_widths[] = {{\n{array(self.widths)}\n}};",
+                "",
+                "/* position of the first column of each glyph in a cell of WIDTH columns */",
+                f"static const uint8_t {name}_lefts[] = {{\n{array(self.lefts)}\n}};",
+                "",
+                "/* columns of BYTES_PER_COLUMN bytes, top dot as least significant bit */",
+                f"static const uint8_t {name}_data[] = {{\n{array(self.data)}\n}};",
+                "",
+                "#endif",
+                "",
+            ]
+        )
+
+    def to_python_module(self):
+        """
+        returns the packed font as the source of a Python module, that can be loaded with from_module
+
+        Returns
+        -------
+        Python source : str
+        """
+        return "\n".join(
+            [
+                f"# {self.name}, generated by ndots {__version__}",
+                f"name = {self.name!r}",
+                f"width = {self.width}",
+                f"height = {self.height}",
+                f"chars = {self.chars!r}",
+                f"offsets = {self.offsets!r}",
+                f"widths = {self.widths!r}",
+                f"lefts = {self.lefts!r}",
+                f"data = {self.data!r}",
+                "",
+            ]
+        )
+
+
+def pack_font(font):
+    """
+    packs a font into a compact representation, e.g. for microcontroller firmware
+
+    Parameters
+    ----------
+    font : _Dots
+        font to pack, e.g. fiftydots
+
+    Returns
+    -------
+    packed font : PackedFont
+    """
+    chars = "".join(font._chartable)
+    offsets = []
+    widths = []
+    lefts = []
+    data = bytearray()
+    bytes_per_column = (font.height() + 7) // 8
+    for c in chars:
+        columns = font._packed_columns_char(c)
+        used = [x for x, column in enumerate(columns) if column]
+        if used:
+            columns = columns[used[0] : used[-1] + 1]
+        else:
+            columns = ()
+        offsets.append(len(data))
+        widths.append(len(columns))
+        lefts.append(used[0] if used else 0)
+        for column in columns:
+            data.extend(column.to_bytes(bytes_per_column, "little"))
+    return PackedFont(font.name(), font.width(), font.height(), chars, offsets, widths, lefts, data)
 
 
 fiftydots = _Dots(
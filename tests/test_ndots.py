@@ -4,6 +4,8 @@ from textwrap import dedent
 from pathlib import Path
 import sys
 import os
+import itertools
+import json
 
 if __name__ == "__main__":  # to make the tests run without the pytest cli
     file_folder = Path(__file__).parent
@@ -338,5 +340,437 @@ def test_misc():
     assert set(ndots.available_fonts()) == {fifteendots, fiftydots, twentyfourdots}
 
 
+def test_canvas():
+    canvas = ndots.Canvas(width=12, height=6)
+    assert canvas.text(fifteendots, "12", x=1, y=1) == 7
+    assert canvas.grid() == [[False] * 12] + [[False] + line + 4 * [False] for line in fifteendots.grid("12")]
+    assert canvas.dirty_regions() == [(1, 1, 7, 5)]
+    assert canvas.dirty_regions() == []
+
+    canvas.text(fifteendots, "13", x=1, y=1)
+    assert canvas.dirty_regions() == [(5, 4, 3, 1)]
+    canvas.text(fifteendots, "13", x=1, y=1)
+    assert canvas.dirty_regions() == []
+
+    canvas.text(fifteendots, "7", x=10, y=-2)
+    assert [row & 0b11 for row in canvas.rows()[:3]] == [0b01, 0b01, 0b01]
+    assert canvas.dirty_regions() == [(11, 0, 1, 3)]
+
+    canvas.clear_rect(0, 0, 6, 6)
+    assert canvas.dirty_regions() == [(1, 1, 5, 5)]
+    canvas.clear()
+    assert canvas.rows() == 6 * [0]
+
+
+def test_counter_renderer():
+    counter = ndots.CounterRenderer(fifteendots)
+    assert counter.update("12:34") == [(0, 0, 3), (1, 4, 3), (2, 8, 3), (3, 12, 3), (4, 16, 3)]
+    assert counter.update("12:39") == [(4, 16, 3)]
+    assert counter.update("12:39") == []
+    assert counter.grid() == fifteendots.grid("12:39")
+    assert counter.update("9") == [(0, 0, 3)]
+    assert counter.rows() == fifteendots._packed("9")[1]
+    for i in range(1000):
+        counter.update("%05d" % i)
+    assert counter._canvas._dirty == []
+
+    counter = ndots.CounterRenderer(fiftydots, proportional=True)
+    counter.update("10:00")
+    assert counter.width() == 5 + 1 + 5 + 1 + 2 + 1 + 5 + 1 + 5
+    assert counter.update("11:00") == [(1, 6, 5)]
+    assert [line[6:11] for line in counter.grid()] == [[False] + line + [False] for line in fiftydots.grid("1", proportional=True)]
+
+
+def test_render_window():
+    s = "abc defghi!A" * 3
+    full = fiftydots.grid(s, proportional=True)
+    for x_start, x_end in ((0, 10), (7, 30), (100, 180), (0, 0)):
+        assert fiftydots.render_window(s, x_start, x_end, proportional=True) == [line[x_start:x_end] for line in full]
+    assert fiftydots.render_window(s, -3, 2, proportional=True) == [3 * [False] + line[:2] for line in full]
+    assert fifteendots.render_window("12", 5, 10) == [line[5:] + 3 * [False] for line in fifteendots.grid("12")]
+
+
+def test_iter_columns():
+    with pytest.raises(ValueError):
+        fifteendots.iter_columns("abc", default="xx")
+    def chars():
+        yield from "abc "
+        yield "defghi!A"
+
+    grid = fiftydots.grid("abc defghi!A", intra=2, proportional=True)
+    columns = list(fiftydots.iter_columns(chars(), intra=2, proportional=True))
+    assert columns == [sum(grid[y][x] << y for y in range(10)) for x in range(len(grid[0]))]
+
+    columns = fifteendots.iter_columns(itertools.cycle("1"))
+    assert list(itertools.islice(columns, 5)) == [0b10010, 0b11111, 0b10000, 0, 0b10010]
+
+
+def test_scan_rows():
+    with pytest.raises(ValueError):
+        fifteendots.scan_rows("12", default="xx")
+    with pytest.raises(ValueError):
+        fifteendots.scan_rows("12", width=20, align="x")
+    assert list(fifteendots.scan_rows("12")) == [0b0100111, 0b1100001, 0b0100111, 0b0100100, 0b1110111]
+    assert list(fifteendots.scan_rows("12", msb_first=False)) == [0b1110010, 0b1000011, 0b1110010, 0b0010010, 0b1110111]
+    assert list(fifteendots.scan_rows("12", as_bytes=True)) == [b"\x4e", b"\xc2", b"\x4e", b"\x48", b"\xee"]
+    assert next(fifteendots.scan_rows("12", as_bytes=True, msb_first=False, invert=True)) == b"\x0d"
+    assert list(fiftydots.scan_rows("abc", width=20, as_bytes=True))[3] == b"\x39\x63\x80"
+
+
+def test_to_pages():
+    assert twentyfourdots.to_pages("1") == bytes([0b01000010, 0b01111111, 0b01000000])
+    assert fifteendots.to_pages("1", width=5, align="r") == bytes([0, 0, 0b10010, 0b11111, 0b10000])
+
+    pages = fiftydots.to_pages("ab", intra=2)
+    assert len(pages) == 2 * 12
+    grid = fiftydots.grid("ab", intra=2)
+    assert list(pages) == [sum(grid[y][x] << (y % 8) for y in range(page * 8, min(page * 8 + 8, 10))) for page in range(2) for x in range(12)]
+
+
+def test_max7219_chain():
+    rows = list(twentyfourdots.scan_rows("A", width=8, align="l"))
+    chain = ndots.Max7219Chain(1)
+    assert chain.encode(twentyfourdots, "A") == [bytes([register + 1, rows[register]]) for register in range(8)]
+    chain = ndots.Max7219Chain(1, rotation=180)
+    assert chain.encode(twentyfourdots, "A") == [bytes([register + 1, ndots.ndots._REVERSED_BITS[rows[7 - register]]]) for register in range(8)]
+
+    chain = ndots.Max7219Chain(2)
+    assert chain.encode(fifteendots, "1", y=1, align="r")[1] == bytes([2, 0b00000010, 2, 0])
+    assert ndots.Max7219Chain(2, reverse=True).encode(fifteendots, "1", y=1, align="r")[1] == bytes([2, 0, 2, 0b00000010])
+    canvas = ndots.Canvas(16, 8)
+    canvas.text(fifteendots, "1", x=13, y=1)
+    assert chain.encode_rows(canvas.rows()) == chain.encode(fifteendots, "1", y=1, align="r")
+    with pytest.raises(ValueError):
+        ndots.Max7219Chain(2, rotation=45)
+
+
+def test_hub75_frame():
+    frame = ndots.Hub75Frame(width=4, height=10, bit_depth=2)
+    frame.text(fifteendots, "1", x=0, y=0, color=(255, 0, 128))
+    frame.text(fifteendots, "-", x=1, y=5, color=(0, 64, 0))
+    planes = frame.bitplanes()
+    assert len(planes) == 2 * 5 * 4
+    # bit 0: red in the upper half, green in the lower half
+    assert planes[:20] == bytes([0, 1, 0, 0, 1, 1, 0, 0, 0, 1 | 8 * 2, 8 * 2, 8 * 2, 0, 1, 0, 0, 1, 1, 1, 0])
+    # bit 1: red and blue in the upper half
+    assert planes[20:] == bytes([0, 5, 0, 0, 5, 5, 0, 0, 0, 5, 0, 0, 0, 5, 0, 0, 5, 5, 5, 0])
+
+    if ndots.ndots.numpy is not None:
+        assert frame._bitplanes_numpy() == frame._bitplanes_python()
+
+    with pytest.raises(ValueError):
+        ndots.Hub75Frame(width=4, height=5)
+
+
+def test_strip_map():
+    assert ndots.strip_map(3, 2) == ((0, 1, 2), (5, 4, 3))
+    assert ndots.strip_map(3, 2, serpentine=False) == ((0, 1, 2), (3, 4, 5))
+    assert ndots.strip_map(3, 2, origin="bottom-right", orientation="columns") == ((5, 2, 1), (4, 3, 0))
+    with pytest.raises(ValueError):
+        ndots.strip_map(3, 2, origin="center")
+
+    buffer = fifteendots.to_ws2812("1", color=(1, 2, 3), background=(0, 0, 0), origin="top-left", orientation="columns")
+    grid = fifteendots.grid("1")
+    mapping = ndots.strip_map(3, 5, orientation="columns")
+    for y in range(5):
+        for x in range(3):
+            index = mapping[y][x]
+            assert buffer[3 * index : 3 * index + 3] == (b"\x02\x01\x03" if grid[y][x] else b"\x00\x00\x00")
+
+
+def test_grid_to_ansi():
+    assert fifteendots.grid_to_ansi("1") == "▄█ \n █ \n▀▀▀"
+    assert twentyfourdots.grid_to_ansi("-", color=(255, 0, 0)).splitlines()[1] == "\x1b[38;2;255;0;0m▄▄ \x1b[0m"
+
+    display = ndots.AnsiDisplay(line=3, column=2)
+    assert display.update(fifteendots, "12") == "\x1b[3;2H▄█  ▀▀█\x1b[4;2H █  █▀▀\x1b[5;2H▀▀▀ ▀▀▀"
+    assert display.update(fifteendots, "13") == "\x1b[4;6H▀▀█"
+    assert display.update(fifteendots, "13") == ""
+    assert display.update(fifteendots, "1") == "\x1b[3;6H   \x1b[4;6H   \x1b[5;6H   "
+
+
+def test_grid_to_braille():
+    assert fifteendots.grid_to_braille("1") == "⢺⠀\n⠉⠁"
+    assert fifteendots.grid_to_braille("1", width=2, align="l") == "⢺\n⠉"
+    assert fiftydots.grid_to_braille("") == "\n\n"
+
+
+def test_grid_to_str_on_off():
+    assert fifteendots.grid_to_str("1", leftborder="", rightborder="", on="#", off=".") == ".#.\n##.\n.#.\n.#.\n###"
+    assert fifteendots.grid_to_str("1", on="#", off=".", width=5, align="r").splitlines()[0] == "<...#.>"
+    assert fifteendots.grid_to_str("11", on="#", off=".", width=4, align="c").splitlines()[4] == "<## #>".replace(" ", ".")
+    with pytest.raises(ValueError):
+        fifteendots.grid_to_str("1", on="##")
+
+
+def test_write_pbm_pgm():
+    import io
+
+    f = io.BytesIO()
+    fifteendots.write_pbm(f, "1")
+    assert f.getvalue() == b"P4\n3 5\n" + bytes([0b01000000, 0b11000000, 0b01000000, 0b01000000, 0b11100000])
+
+    f = io.BytesIO()
+    fifteendots.write_pbm(f, "1", scale=3)
+    assert f.getvalue().startswith(b"P4\n9 15\n" + 3 * bytes([0b00011100, 0b00000000]) + 3 * bytes([0b11111100, 0b00000000]))
+
+    f = io.BytesIO()
+    fifteendots.write_pgm(f, "1", scale=2, on=1, off=0)
+    assert f.getvalue().startswith(b"P5\n6 10\n255\n" + 2 * bytes([0, 0, 1, 1, 0, 0]) + 2 * bytes([1, 1, 1, 1, 0, 0]))
+
+
+def test_to_png():
+    import struct
+    import zlib
+
+    png = fifteendots.to_png("1", dot_size=2, gap=1, on_color=(255, 0, 0), off_color=(0, 0, 255), background=(0, 0, 0))
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    assert png[12:16] == b"IHDR"
+    assert struct.unpack(">II", png[16:24]) == (3 * 3 + 1, 5 * 3 + 1)
+    length = struct.unpack(">I", png[33:37])[0]
+    assert png[37:41] == b"IDAT"
+    raw = zlib.decompress(png[41 : 41 + length])
+    scanlines = [raw[i + 1 : i + 31] for i in range(0, len(raw), 31)]
+    assert len(scanlines) == 16
+    assert scanlines[0] == bytes(30)
+    assert scanlines[1] == bytes(3) + 2 * b"\x00\x00\xff" + bytes(3) + 2 * b"\xff\x00\x00" + bytes(3) + 2 * b"\x00\x00\xff" + bytes(3)
+
+    png = fifteendots.to_png("1", dot_size=4, gap=0, shape="round")
+    raw = zlib.decompress(png[41 : 41 + struct.unpack(">I", png[33:37])[0]])
+    assert raw[1 + 3 * 4 : 1 + 3 * 8] == bytes(3) + 6 * b"\xff" + bytes(3)
+
+
+def test_to_svg():
+    svg = fifteendots.to_svg("1", dot_size=4)
+    assert svg.splitlines() == [
+        '<svg xmlns="http://www.w3.org/2000/svg" width="12" height="20" viewBox="0 0 3 5">',
+        '<g fill="black">',
+        '<rect x="1" y="0" width="1" height="1"/>',
+        '<rect x="0" y="1" width="2" height="1"/>',
+        '<rect x="1" y="2" width="1" height="2"/>',
+        '<rect x="0" y="4" width="3" height="1"/>',
+        "</g>",
+        "</svg>",
+    ]
+    svg = fifteendots.to_svg("1", shape="circle", on_color="red", off_color="gray", background="black")
+    assert svg.count("<circle") == 15
+    assert svg.count('<rect width="3" height="5" fill="black"/>') == 1
+
+
+def test_rectangles():
+    assert fifteendots.rectangles("1") == [(1, 0, 1, 1), (0, 1, 2, 1), (1, 2, 1, 2), (0, 4, 3, 1)]
+    assert fifteendots.rectangles("--", intra=0) == [(0, 2, 6, 1)]
+    assert fifteendots.rectangles("--", intra=1, x_offset=10, y_offset=20) == [(10, 22, 3, 1), (14, 22, 3, 1)]
+    assert fifteendots.rectangles("--", intra=0, width=4, align="r") == [(0, 2, 4, 1)]
+
+    for s in ("abc defghi!A", "mwGMW"):
+        dots = set()
+        for x, y, width, height in fiftydots.rectangles(s, proportional=True):
+            dots |= {(x + dx, y + dy) for dx in range(width) for dy in range(height)}
+        assert dots == set(fiftydots.coordinates(s, proportional=True))
+
+
+def test_contours():
+    assert fifteendots.contours("0") == [[(0, 0), (3, 0), (3, 5), (0, 5)], [(1, 1), (1, 4), (2, 4), (2, 1)]]
+    assert fifteendots.contours("1", x_offset=10) == [[(11, 0), (12, 0), (12, 4), (13, 4), (13, 5), (10, 5), (10, 4), (11, 4), (11, 2), (10, 2), (10, 1), (11, 1)]]
+    assert fifteendots.contours("--", intra=0) == [[(0, 2), (6, 2), (6, 3), (0, 3)]]
+    assert len(fifteendots.contours("--")) == 2
+    assert fifteendots.contours("0", width=2, align="l") == [[(0, 0), (2, 0), (2, 1), (1, 1), (1, 4), (2, 4), (2, 5), (0, 5)]]
+
+    def area(contour):
+        return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(contour, contour[1:] + contour[:1])) / 2
+
+    for s in ("abc defghi!A", "%@&"):
+        assert sum(area(contour) for contour in fiftydots.contours(s)) == len(fiftydots.coordinates(s))
+
+
+def test_coordinates_order():
+    assert fifteendots.coordinates("1", order="serpentine") == [(0, 1), (0, 4), (1, 4), (1, 3), (1, 2), (1, 1), (1, 0), (2, 4)]
+    assert fifteendots.coordinates("1", order="nearest") == [(0, 1), (1, 1), (1, 0), (1, 2), (1, 3), (1, 4), (0, 4), (2, 4)]
+    assert fifteendots.coordinates("11", order="nearest", x_offset=1)[8:] == [(5, 1), (6, 1), (6, 0), (6, 2), (6, 3), (6, 4), (5, 4), (7, 4)]
+
+    def travel(coordinates):
+        return sum(abs(x1 - x0) + abs(y1 - y0) for (x0, y0), (x1, y1) in zip(coordinates, coordinates[1:]))
+
+    s = "SN-2024-000123456"
+    for value in (True, False):
+        coordinates = fiftydots.coordinates(s, value=value, x_first=True)
+        for order in ("serpentine", "nearest"):
+            ordered = fiftydots.coordinates(s, value=value, order=order)
+            assert sorted(ordered) == sorted(coordinates)
+            assert travel(ordered) < travel(coordinates)
+    with pytest.raises(ValueError):
+        fiftydots.coordinates(s, order="random")
+
+
+def test_export_atlas(tmp_path):
+    import struct
+    import zlib
+
+    path = tmp_path / "fifteendots.png"
+    metrics = ndots.export_atlas(fifteendots, path, columns=8, padding=1)
+    assert (metrics["width"], metrics["height"]) == (3, 5)
+    assert metrics["atlas_width"] == 8 * 4 + 1
+    assert metrics["glyphs"][" "] == dict(x=1, y=1, proportional_offset=0, proportional_width=2, narrow_width=1)
+    assert json.loads((tmp_path / "fifteendots.json").read_text(encoding="utf-8")) == metrics
+
+    png = path.read_bytes()
+    width, height = struct.unpack(">II", png[16:24])
+    raw = zlib.decompress(png[41 : 41 + struct.unpack(">I", png[33:37])[0]])
+    lines = [raw[y * (width + 1) + 1 : (y + 1) * (width + 1)] for y in range(height)]
+    for c in "1aZ":
+        glyph = metrics["glyphs"][c]
+        assert [[dot == 255 for dot in line[glyph["x"] : glyph["x"] + 3]] for line in lines[glyph["y"] : glyph["y"] + 5]] == fifteendots.grid(c)
+
+    path.write_bytes(b"cached")
+    assert ndots.export_atlas(fifteendots, path, columns=8, padding=1) == metrics
+    assert path.read_bytes() == b"cached"
+    ndots.export_atlas(fifteendots, path, columns=16, padding=1)
+    assert path.read_bytes().startswith(b"\x89PNG")
+
+
+def test_pack_font():
+    import types
+
+    for font in ndots.available_fonts():
+        packed_font = ndots.pack_font(font)
+        module = types.ModuleType(font.name())
+        exec(packed_font.to_python_module(), module.__dict__)
+        decoder = ndots.PackedFont.from_module(module)
+        for s in ("abc defghi!A", "0123456789", "mwGMW", "€"):
+            for kwargs in (dict(), dict(proportional=True, intra=2), dict(proportional=True, narrow=True, width=23, align="r"), dict(width=7, align="c")):
+                assert decoder.grid(s, **kwargs) == font.grid(s, **kwargs)
+
+    packed_font = ndots.pack_font(fifteendots)
+    i = packed_font.chars.index("1")
+    assert (packed_font.widths[i], packed_font.lefts[i]) == (3, 0)
+    assert packed_font.data[packed_font.offsets[i] : packed_font.offsets[i] + 3] == bytes([0b10010, 0b11111, 0b10000])
+    header = packed_font.to_c_header(name="tiny")
+    assert "#define TINY_HEIGHT 5" in header
+    assert "static const uint8_t tiny_data[] = {" in header
+    assert packed_font.grid("12", default="\x80") == fifteendots.grid("12", default="\x80")
+    with pytest.raises(LookupError):
+        fifteendots.grid("1\x81", default="\x80")
+    with pytest.raises(KeyError):
+        packed_font.grid("1\x81", default="\x80")
+
+
+def test_subset(tmp_path):
+    sub = ndots.fiftydots.subset("0123456789:", name="clockdots")
+    assert sub.name() == "clockdots"
+    assert sub.has_char("1") and sub.has_char(" ") and not sub.has_char("x")
+    assert sub.grid("12:34 x") == ndots.fiftydots.grid("12:34  ")
+    assert sub.grid("12:34", proportional=True) == ndots.fiftydots.grid("12:34", proportional=True)
+    sub.save(tmp_path / "clockdots.ndots")
+    loaded = ndots.load_font(tmp_path / "clockdots.ndots")
+    assert loaded.name() == "clockdots"
+    assert (loaded.width(), loaded.height()) == (sub.width(), sub.height())
+    assert loaded.grid_to_str("12:34") == sub.grid_to_str("12:34")
+    ndots.twentyfourdots.save(tmp_path / "twentyfourdots.ndots")
+    loaded = ndots.load_font(tmp_path / "twentyfourdots.ndots")
+    assert loaded.grid_to_str("Hello!") == ndots.twentyfourdots.grid_to_str("Hello!")
+
+
+def test_memory_report():
+    report = ndots.memory_report()
+    assert set(report) == {"fifteendots", "fiftydots", "twentyfourdots", "all"}
+    for entry in report.values():
+        assert 0 < entry["after"] < entry["before"]
+    assert report["all"]["before"] == sum(report[font.name()]["before"] for font in ndots.available_fonts())
+    assert report["all"]["after"] <= sum(report[font.name()]["after"] for font in ndots.available_fonts())
+    blank_row = ndots.fiftydots._chartable[" "][0]
+    assert all(row is blank_row for font in ndots.available_fonts() for row in font._chartable[" "] if not any(row) and len(row) == len(blank_row))
+    assert ndots.fiftydots.grid("A") == [list(row) for row in ndots.fiftydots._chartable["A"]]
+
+
+def test_bitmap():
+    bitmap = ndots.fiftydots.bitmap("Hi 12", proportional=True)
+    grid = ndots.fiftydots.grid("Hi 12", proportional=True)
+    assert (bitmap.width(), bitmap.height(), len(bitmap)) == (len(grid[0]), 10, 10)
+    assert bitmap.to_list() == grid
+    assert bitmap.rows() == ndots.fiftydots._packed("Hi 12", proportional=True)[1]
+    assert bitmap[3] == tuple(grid[3])
+    assert bitmap[4, 2] is grid[4][2]
+    assert bitmap[-1, -1] is grid[-1][-1]
+    assert bitmap.column(0) == sum(grid[y][0] << y for y in range(10))
+    view = bitmap[2:7, 3:9]
+    assert view.to_list() == [row[3:9] for row in grid[2:7]]
+    assert view[1:3, 2:].to_list() == [row[5:9] for row in grid[3:5]]
+    assert bytes(view) == b"".join(ndots.ndots._row_to_bytes(row, 6) for row in view.rows())
+    assert bitmap.memoryview().obj is bitmap[1:3].memoryview().obj
+    assert bytes(bitmap[1:3]) == bytes(bitmap)[3:9]
+    assert bitmap == ndots.Bitmap(bitmap.width(), bitmap.height(), bytes(bitmap))
+    assert hash(bitmap) == hash(ndots.Bitmap.from_rows(bitmap.rows(), bitmap.width()))
+    assert bitmap != view
+    with pytest.raises(IndexError):
+        bitmap[10]
+    with pytest.raises(ValueError):
+        bitmap[::2]
+    with pytest.raises(ValueError):
+        ndots.Bitmap(8, 2, b"\x00")
+    canvas = ndots.Canvas(20, 10)
+    canvas.text(ndots.fiftydots, "12")
+    assert canvas.bitmap().to_list() == canvas.grid()
+
+
+def test_bitmap_operators():
+    a = ndots.fiftydots.bitmap("12", width=12)
+    b = ndots.fiftydots.bitmap("88", width=12)
+    grid_a = a.to_list()
+    grid_b = b.to_list()
+    assert (a | b).to_list() == [[p or q for p, q in zip(row_a, row_b)] for row_a, row_b in zip(grid_a, grid_b)]
+    assert (a & b).to_list() == [[p and q for p, q in zip(row_a, row_b)] for row_a, row_b in zip(grid_a, grid_b)]
+    assert (a ^ b).to_list() == [[p != q for p, q in zip(row_a, row_b)] for row_a, row_b in zip(grid_a, grid_b)]
+    assert (~a).to_list() == [[not p for p in row] for row in grid_a]
+    assert (~a[1:5, 2:7]).to_list() == [[not p for p in row[2:7]] for row in grid_a[1:5]]
+    assert (a >> 2).to_list() == [[False] * 2 + row[:-2] for row in grid_a]
+    assert (a << 3).to_list() == [row[3:] + [False] * 3 for row in grid_a]
+    assert a.shift(dy=2).to_list() == [[False] * 12] * 2 + grid_a[:-2]
+    assert a.shift(1, -3).to_list() == [[False] + row[:-1] for row in grid_a[3:]] + [[False] * 12] * 3
+    assert a.shift(dy=20).to_list() == [[False] * 12] * 10
+    with pytest.raises(ValueError):
+        a | ndots.fiftydots.bitmap("1")
+    with pytest.raises(TypeError):
+        a | 1
+
+
+def test_renderer():
+    options = ndots.RenderOptions(proportional=True, width=30, align="Right")
+    assert options.align == "r"
+    assert ndots.fiftydots.grid("12:34", **options) == ndots.fiftydots.grid("12:34", proportional=True, width=30, align="r")
+    assert options.replace(width=None) == ndots.RenderOptions(proportional=True, align="r")
+    assert hash(options) == hash(ndots.RenderOptions(proportional=True, width=30, align="r"))
+    with pytest.raises(AttributeError):
+        options.width = 20
+    with pytest.raises(ValueError):
+        ndots.RenderOptions(default="")
+    with pytest.raises(ValueError):
+        ndots.RenderOptions(align="x")
+
+    renderer = ndots.fiftydots.renderer(options)
+    assert renderer is ndots.fiftydots.renderer(proportional=True, width=30, align="r")
+    assert renderer.options() is options
+    assert ndots.fiftydots.renderer(options, width=40).options().width == 40
+    for font in ndots.available_fonts():
+        for s, intra, proportional, width, align, narrow in itertools.product(["Hi 12!", "abc defghi!A€"], [0, 2], [False, True], [None, 3, 80], ["c", "l", "r"], [False, True]):
+            options = dict(intra=intra, proportional=proportional, width=width, align=align, narrow=narrow)
+            renderer = font.renderer(**options)
+            assert renderer(s) == font.grid(s, **options)
+            assert renderer.rows(s) == font._packed(s, **options)
+            assert renderer.bitmap(s) == font.bitmap(s, **options)
+    assert ndots.fiftydots.renderer()("") == ndots.fiftydots.grid("")
+
+    options = ndots.RenderOptions(narrow=True)
+    assert options.narrow
+    assert options.replace(proportional=True).narrow
+    assert len(ndots.fiftydots.grid(" a", **options.replace(proportional=True))[0]) == len(ndots.fiftydots.grid(" a", proportional=True, narrow=True)[0])
+    assert ndots.fiftydots.renderer(options, proportional=True)(" a") == ndots.fiftydots.grid(" a", proportional=True, narrow=True)
+
+    renderer = ndots.fifteendots.renderer(default="\x80")
+    assert renderer("12") == ndots.fifteendots.grid("12", default="\x80")
+    with pytest.raises(KeyError):
+        renderer("1\x81")
+
+
 if __name__ == "__main__":
     pytest.main(["-vv", "-s", "-x", __file__])